@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the recorder's encoder profiles.
+Renders a synthetic desktop-like frame set (or uses a directory of frame_%06d.jpg fixtures),
+encodes it with each profile exactly as convert_to_video would, and reports wall time,
+CPU time, peak RSS of the FFmpeg processes, and output size.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import screen_recorder  # noqa: E402
+
+def render_synthetic_frames(frames_dir, count, resolution):
+    """Write desktop-like JPEG frames from the recorder's synthetic source: static windows with typing and scrolling."""
+    source = screen_recorder.SyntheticSource(resolution)
+    for number in range(count):
+        source.grab().save(os.path.join(frames_dir, f"frame_{number:06d}.jpg"), "JPEG", quality=60)
+
+def run_measured(cmd):
+    """Run a command to completion and return (returncode, wall seconds, cpu seconds, peak RSS bytes, stderr)."""
+    started = time.perf_counter()
+    process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    stderr = process.stderr.read()
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.perf_counter() - started
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    peak_rss = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    return process.returncode, wall, usage.ru_utime + usage.ru_stime, peak_rss, stderr.decode(errors="replace")
+
+def benchmark_profile(recorder, frames_dir, work_dir, profile_name):
+    session_dir = os.path.join(work_dir, profile_name)
+    os.makedirs(session_dir)
+    for name in os.listdir(frames_dir):
+        os.symlink(os.path.join(frames_dir, name), os.path.join(session_dir, name))
+    output_file = os.path.join(session_dir, screen_recorder.VIDEO_FILE)
+    commands, _ = recorder.conversion_commands(session_dir, output_file, profile_name)
+
+    result = {"wall_seconds": 0.0, "cpu_seconds": 0.0, "peak_rss_mb": 0.0, "passes": len(commands)}
+    for cmd in commands:
+        returncode, wall, cpu, peak_rss, stderr = run_measured(cmd)
+        if returncode != 0:
+            return {"error": stderr.strip().splitlines()[-1] if stderr.strip() else f"exit code {returncode}"}
+        result["wall_seconds"] += wall
+        result["cpu_seconds"] += cpu
+        result["peak_rss_mb"] = max(result["peak_rss_mb"], peak_rss / (1024 * 1024))
+    result["output_mb"] = os.path.getsize(output_file) / (1024 * 1024)
+    return {key: round(value, 3) if isinstance(value, float) else value for key, value in result.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark encoder profiles on a synthetic or fixture frame set")
+    parser.add_argument("--frames", type=int, default=300, help="Synthetic frames to render (default: 300)")
+    parser.add_argument("--width", type=int, default=1280, help="Synthetic frame width (default: 1280)")
+    parser.add_argument("--height", type=int, default=720, help="Synthetic frame height (default: 720)")
+    parser.add_argument("--fps", type=float, default=1, help="Frame rate to encode at (default: 1)")
+    parser.add_argument("--frames-dir", type=str, help="Use existing frame_%%06d.jpg files instead of synthetic ones")
+    parser.add_argument("--profiles", nargs="+", choices=sorted(screen_recorder.ENCODER_PROFILES),
+                        default=list(screen_recorder.ENCODER_PROFILES), help="Profiles to run (default: all)")
+    parser.add_argument("--json", type=str, help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    if shutil.which("ffmpeg") is None:
+        sys.exit("❌ FFmpeg not found. Please install FFmpeg to run this benchmark.")
+
+    work_dir = tempfile.mkdtemp(prefix="encoder_bench_")
+    try:
+        if args.frames_dir:
+            frames_dir = os.path.abspath(args.frames_dir)
+        else:
+            frames_dir = os.path.join(work_dir, "frames")
+            os.makedirs(frames_dir)
+            print(f"🖼️  Rendering {args.frames} synthetic {args.width}x{args.height} frames...")
+            render_synthetic_frames(frames_dir, args.frames, (args.width, args.height))
+        frame_count = sum(1 for f in os.listdir(frames_dir) if f.startswith("frame_") and f.endswith(".jpg"))
+
+        recorder = screen_recorder.ScreenRecorder(fps=args.fps, output_dir=os.path.join(work_dir, "recorder"),
+                                                  sprites=False)
+        results = {"frames": frame_count, "fps": args.fps, "profiles": {}}
+        print(f"{'profile':<10} {'passes':>6} {'wall s':>9} {'cpu s':>9} {'peak MB':>9} {'out MB':>9}")
+        for profile_name in args.profiles:
+            result = benchmark_profile(recorder, frames_dir, work_dir, profile_name)
+            results["profiles"][profile_name] = result
+            if "error" in result:
+                print(f"{profile_name:<10} ❌ {result['error']}")
+            else:
+                print(f"{profile_name:<10} {result['passes']:>6} {result['wall_seconds']:>9.2f} {result['cpu_seconds']:>9.2f} "
+                      f"{result['peak_rss_mb']:>9.1f} {result['output_mb']:>9.2f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+if __name__ == "__main__":
+    main()
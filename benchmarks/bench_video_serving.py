@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the viewer's video serving.
+Generates a synthetic recording, serves it with the viewer app on a local threaded server,
+and measures time-to-first-frame (first bytes of the file), seek latency (random range
+requests), multi-range requests and 304 revalidation.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.client
+from statistics import median
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'screen_recordings_viewer'))
+import app as viewer  # noqa: E402
+from werkzeug.serving import make_server  # noqa: E402
+
+SESSION_FOLDER = "20250101_090000"
+
+def make_synthetic_recording(session_dir, minutes, size_mb):
+    """Encode a synthetic screen-like MP4, falling back to random bytes if FFmpeg is missing."""
+    output_file = os.path.join(session_dir, "recording.mp4")
+    cmd = [
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size=1280x720:rate=1:duration={minutes * 60}",
+        "-c:v", "libx264", "-preset", "veryfast", "-tune", "stillimage", "-crf", "30",
+        "-pix_fmt", "yuv420p", "-movflags", "+faststart",
+        output_file
+    ]
+    try:
+        subprocess.run(cmd, check=True, capture_output=True)
+        return output_file, "ffmpeg"
+    except (FileNotFoundError, subprocess.CalledProcessError):
+        print("⚠️  FFmpeg unavailable; serving random bytes instead of a real MP4.")
+        with open(output_file, "wb") as f:
+            f.write(os.urandom(size_mb * 1024 * 1024))
+        return output_file, "random"
+
+def timed_request(host, port, path, headers, read_bytes=None):
+    """Issue one GET and return (status, seconds until read_bytes were received, or the full body)."""
+    conn = http.client.HTTPConnection(host, port)
+    started = time.perf_counter()
+    conn.request("GET", path, headers=headers)
+    response = conn.getresponse()
+    if read_bytes is None:
+        response.read()
+    else:
+        response.read(read_bytes)
+    elapsed = time.perf_counter() - started
+    conn.close()
+    return response.status, elapsed
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "p50_ms": round(median(samples) * 1000, 3),
+        "p95_ms": round(samples[int(0.95 * (len(samples) - 1))] * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3),
+        "n": len(samples),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serve_recording against a local synthetic MP4")
+    parser.add_argument("--minutes", type=int, default=30, help="Length of the synthetic recording at 1 fps (default: 30)")
+    parser.add_argument("--size-mb", type=int, default=64, help="Size of the random-bytes fallback file (default: 64)")
+    parser.add_argument("--iterations", type=int, default=50, help="Requests per measurement (default: 50)")
+    parser.add_argument("--first-frame-bytes", type=int, default=512 * 1024,
+                        help="Bytes a player needs before the first frame (default: 512 KiB)")
+    parser.add_argument("--seek-bytes", type=int, default=256 * 1024, help="Bytes read per seek (default: 256 KiB)")
+    parser.add_argument("--json", type=str, help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as recordings_dir:
+        session_dir = os.path.join(recordings_dir, SESSION_FOLDER)
+        os.makedirs(session_dir)
+        video_file, source = make_synthetic_recording(session_dir, args.minutes, args.size_mb)
+        file_size = os.path.getsize(video_file)
+        viewer.RECORDINGS_BASE_DIR = recordings_dir
+
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)  # No per-request log lines
+        server = make_server("127.0.0.1", 0, viewer.app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address
+        path = f"/recordings/{SESSION_FOLDER}/recording.mp4"
+        print(f"📼 Serving {file_size / (1024 * 1024):.1f} MB ({source}) on http://{host}:{port}{path}")
+
+        first_frame, seeks, multi_range, revalidate = [], [], [], []
+        rng = random.Random(0)
+        conn = http.client.HTTPConnection(host, port)
+        conn.request("HEAD", path)
+        etag = conn.getresponse().getheader("ETag")
+        conn.close()
+
+        for _ in range(args.iterations):
+            _, elapsed = timed_request(host, port, path, {"Range": "bytes=0-"}, args.first_frame_bytes)
+            first_frame.append(elapsed)
+
+            start = rng.randrange(0, max(1, file_size - args.seek_bytes))
+            _, elapsed = timed_request(host, port, path, {"Range": f"bytes={start}-{start + args.seek_bytes - 1}"})
+            seeks.append(elapsed)
+
+            starts = sorted(rng.sample(range(0, max(4, file_size - args.seek_bytes), args.seek_bytes), 3))
+            ranges = ",".join(f"{s}-{s + args.seek_bytes // 4 - 1}" for s in starts)
+            _, elapsed = timed_request(host, port, path, {"Range": f"bytes={ranges}"})
+            multi_range.append(elapsed)
+
+            _, elapsed = timed_request(host, port, path, {"If-None-Match": etag})
+            revalidate.append(elapsed)
+
+        server.shutdown()
+
+    results = {
+        "file_size": file_size,
+        "source": source,
+        "time_to_first_frame": summarize(first_frame),
+        "seek": summarize(seeks),
+        "multi_range": summarize(multi_range),
+        "revalidate_304": summarize(revalidate),
+    }
+    for name in ("time_to_first_frame", "seek", "multi_range", "revalidate_304"):
+        stats = results[name]
+        print(f"   {name:<20} p50 {stats['p50_ms']:>8.2f} ms   p95 {stats['p95_ms']:>8.2f} ms   max {stats['max_ms']:>8.2f} ms")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite; runs on headless Linux with no real display or recordings.
+- Recorder: runs the capture loop against the synthetic static and motion frame sources,
+  sequential and pipelined, and reports achieved fps, dropped/late frames and per-stage
+  frame-time percentiles.
+- Viewer: builds synthetic recordings trees (10, 1,000 and 10,000 sessions by default) and
+  measures the cold and warm index scan and the index and day page latency.
+Results go to JSON; --compare prints the change against an earlier results file.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+import subprocess
+from statistics import median
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, '..'))
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, '..', 'screen_recordings_viewer'))
+import screen_recorder  # noqa: E402
+import app as viewer  # noqa: E402
+from synthetic_recordings import build_recordings_tree  # noqa: E402
+
+SESSIONS_PER_DAY = 10
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "p50_ms": round(median(samples) * 1000, 3),
+        "p95_ms": round(samples[int(0.95 * (len(samples) - 1))] * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3),
+        "n": len(samples),
+    }
+
+def bench_recorder(source_name, pipeline, seconds, fps, resize_mode):
+    """Record from a synthetic source for a fixed time and report throughput and stage timings."""
+    with tempfile.TemporaryDirectory() as output_dir, open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            recorder = screen_recorder.ScreenRecorder(
+                fps=fps, output_dir=output_dir, output_mode="frames", auto_convert=False, sprites=False,
+                pipeline=pipeline, resize_mode=resize_mode, frame_source=screen_recorder.make_frame_source(source_name))
+            started = time.perf_counter()
+            recorder.start_recording()
+            time.sleep(seconds)
+            recorder.stop_recording()
+            elapsed = time.perf_counter() - started
+    return {
+        "target_fps": fps,
+        "achieved_fps": round(recorder.total_frames / elapsed, 2),
+        "frames": recorder.total_frames,
+        "dropped_frames": recorder.dropped_frames,
+        "late_frames": recorder.late_frames,
+        "stages": recorder.timers.percentiles(),
+    }
+
+def bench_viewer(session_count, iterations, work_dir):
+    """Build a tree of session_count sessions and time index scans and page loads against it."""
+    root = os.path.join(work_dir, f"recordings_{session_count}")
+    days = build_recordings_tree(root, max(1, session_count // SESSIONS_PER_DAY), min(session_count, SESSIONS_PER_DAY))
+    viewer.RECORDINGS_BASE_DIR = root
+    viewer.METADATA_INDEX_PATH = os.path.join(root, '.metadata_index.json')
+    viewer.metadata_index = None
+    client = viewer.app.test_client()
+
+    started = time.perf_counter()
+    viewer.get_recordings_info()
+    cold_scan = time.perf_counter() - started
+
+    scans, index_pages, day_pages = [], [], []
+    for i in range(iterations):
+        started = time.perf_counter()
+        viewer.get_recordings_info()
+        scans.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        assert client.get('/').status_code == 200
+        index_pages.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        assert client.get(f'/day/{days[i % len(days)]}').status_code == 200
+        day_pages.append(time.perf_counter() - started)
+    shutil.rmtree(root, ignore_errors=True)
+    return {
+        "sessions": session_count,
+        "cold_scan_ms": round(cold_scan * 1000, 3),
+        "scan": summarize(scans),
+        "index_page": summarize(index_pages),
+        "day_page": summarize(day_pages),
+    }
+
+def flatten(results, prefix=""):
+    """Map 'a.b.c' paths to the numeric timing/throughput leaves that are worth comparing."""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, path + "."))
+        elif isinstance(value, (int, float)) and (key.endswith("_ms") or key.endswith("fps")):
+            flat[path] = value
+    return flat
+
+def compare(baseline_path, results):
+    """Print each shared metric next to its baseline value with the relative change."""
+    with open(baseline_path) as f:
+        baseline = flatten(json.load(f))
+    current = flatten(results)
+    print(f"\n📊 Compared with {baseline_path}:")
+    for path in sorted(set(baseline) & set(current)):
+        before, after = baseline[path], current[path]
+        change = f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+        print(f"   {path:<60} {before:>10.2f} -> {after:>10.2f}  {change}")
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARKS_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (FileNotFoundError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline recorder and viewer benchmarks")
+    parser.add_argument("--seconds", type=float, default=10, help="Recording time per recorder run (default: 10)")
+    parser.add_argument("--fps", type=float, default=10, help="Target capture rate for recorder runs (default: 10)")
+    parser.add_argument("--resize-mode", choices=screen_recorder.RESIZE_MODES, default="quality",
+                        help="Recorder resize mode (default: quality)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000],
+                        help="Session counts for viewer runs (default: 10 1000 10000)")
+    parser.add_argument("--iterations", type=int, default=10, help="Measurements per viewer run (default: 10)")
+    parser.add_argument("--skip-recorder", action="store_true", help="Only run the viewer benchmarks")
+    parser.add_argument("--skip-viewer", action="store_true", help="Only run the recorder benchmarks")
+    parser.add_argument("--json", type=str, help="Write results to this JSON file")
+    parser.add_argument("--compare", type=str, help="Baseline results JSON to compare against")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "recorder": {},
+        "viewer": {},
+    }
+
+    if not args.skip_recorder:
+        for source_name in ("static", "motion"):
+            for pipeline in (False, True):
+                name = f"{source_name}_{'pipeline' if pipeline else 'sequential'}"
+                print(f"🎬 Recorder: {name} at {args.fps:g} fps for {args.seconds:g}s...")
+                result = bench_recorder(source_name, pipeline, args.seconds, args.fps, args.resize_mode)
+                results["recorder"][name] = result
+                stages = "  ".join(f"{stage} {stats['p50_ms']:.1f}/{stats['p95_ms']:.1f}ms"
+                                   for stage, stats in result["stages"].items())
+                print(f"   {result['achieved_fps']:.2f} fps, {result['dropped_frames']} dropped, "
+                      f"{result['late_frames']} late; p50/p95 {stages}")
+
+    if not args.skip_viewer:
+        with tempfile.TemporaryDirectory() as work_dir:
+            for session_count in args.sizes:
+                print(f"🗂️  Viewer: {session_count} sessions...")
+                result = bench_viewer(session_count, args.iterations, work_dir)
+                results["viewer"][str(session_count)] = result
+                print(f"   cold scan {result['cold_scan_ms']:.1f} ms, warm scan p50 {result['scan']['p50_ms']:.1f} ms, "
+                      f"index p50 {result['index_page']['p50_ms']:.1f} ms, day p50 {result['day_page']['p50_ms']:.1f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+    if args.compare:
+        compare(args.compare, results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Builds a synthetic recordings tree for benchmarking the viewer without hours of real recording:
+N days x M sessions, each a YYYYMMDD_HHMMSS folder with a tiny MP4 and a complete session.json.
+Every session shares one encoded video (hard-linked where possible), so even 10,000 sessions
+take seconds to build and little disk space.
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import subprocess
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import screen_recorder  # noqa: E402
+
+TINY_VIDEO_SECONDS = 2
+TINY_VIDEO_SIZE = (320, 180)
+
+def make_tiny_video(output_file):
+    """Encode a short test-pattern MP4, falling back to placeholder bytes if FFmpeg is missing."""
+    width, height = TINY_VIDEO_SIZE
+    cmd = [
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate=1:duration={TINY_VIDEO_SECONDS}",
+        "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", "-movflags", "+faststart",
+        output_file
+    ]
+    try:
+        subprocess.run(cmd, check=True, capture_output=True, stdin=subprocess.DEVNULL)
+        return "ffmpeg"
+    except (FileNotFoundError, subprocess.CalledProcessError):
+        with open(output_file, "wb") as f:
+            f.write(os.urandom(16 * 1024))
+        return "placeholder"
+
+def session_manifest(session_name, started, video_size):
+    """A complete manifest in the recorder's format for one synthetic session."""
+    width, height = TINY_VIDEO_SIZE
+    ended = started + timedelta(seconds=TINY_VIDEO_SECONDS)
+    return {
+        "version": screen_recorder.MANIFEST_VERSION,
+        "session": session_name,
+        "status": "complete",
+        "started_at": started.isoformat(timespec="seconds"),
+        "start_timestamp": round(started.timestamp(), 3),
+        "ended_at": ended.isoformat(timespec="seconds"),
+        "end_timestamp": round(ended.timestamp(), 3),
+        "fps": 1,
+        "width": width,
+        "height": height,
+        "output_mode": "stream",
+        "variable_frame_rate": False,
+        "change_threshold": 0.0,
+        "encoder_profile": "fast",
+        "frame_count": TINY_VIDEO_SECONDS,
+        "dropped_frames": 0,
+        "late_frames": 0,
+        "skipped_frames": 0,
+        "video_file": screen_recorder.VIDEO_FILE,
+        "video_size": video_size,
+        "duration": TINY_VIDEO_SECONDS,
+        "encode_seconds": 0.0,
+    }
+
+def build_recordings_tree(root, days, sessions_per_day, first_day="2025-01-01", legacy_every=0):
+    """
+    Create days x sessions_per_day sessions under root, spread evenly over each day.
+    With legacy_every=K, every Kth session has no manifest, so the viewer has to ffprobe it.
+    Returns the sorted list of day strings (YYYY-MM-DD).
+    """
+    os.makedirs(root, exist_ok=True)
+    template = os.path.join(root, ".template.mp4")
+    make_tiny_video(template)
+    video_size = os.path.getsize(template)
+    spacing = max(1, 86400 // max(1, sessions_per_day))
+    start = datetime.strptime(first_day, "%Y-%m-%d")
+
+    day_strings, count = [], 0
+    for day in range(days):
+        day_start = start + timedelta(days=day)
+        day_strings.append(day_start.strftime("%Y-%m-%d"))
+        for number in range(min(sessions_per_day, 86400)):
+            started = (day_start + timedelta(seconds=number * spacing)).astimezone()
+            session_name = started.strftime("%Y%m%d_%H%M%S")
+            session_dir = os.path.join(root, session_name)
+            os.makedirs(session_dir, exist_ok=True)
+            video_file = os.path.join(session_dir, screen_recorder.VIDEO_FILE)
+            if not os.path.exists(video_file):
+                try:
+                    os.link(template, video_file)
+                except OSError:
+                    shutil.copyfile(template, video_file)
+            count += 1
+            if legacy_every and count % legacy_every == 0:
+                continue
+            with open(os.path.join(session_dir, screen_recorder.MANIFEST_FILE), "w") as f:
+                json.dump(session_manifest(session_name, started, video_size), f, indent=2)
+    os.remove(template)
+    return day_strings
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a synthetic recordings tree for viewer benchmarks")
+    parser.add_argument("root", help="Directory to create the sessions in")
+    parser.add_argument("--days", type=int, default=10, help="Number of days (default: 10)")
+    parser.add_argument("--sessions-per-day", type=int, default=6, help="Sessions per day (default: 6)")
+    parser.add_argument("--first-day", default="2025-01-01", help="First day, YYYY-MM-DD (default: 2025-01-01)")
+    parser.add_argument("--legacy-every", type=int, default=0,
+                        help="Leave out the manifest of every Nth session to exercise the ffprobe path (default: never)")
+    args = parser.parse_args()
+
+    days = build_recordings_tree(args.root, args.days, args.sessions_per_day, args.first_day, args.legacy_every)
+    print(f"📁 Created {args.days * args.sessions_per_day} sessions over {len(days)} days in {args.root}")
+
+if __name__ == "__main__":
+    main()
@@ -5,23 +5,593 @@ Captures screenshots at 1fps and saves them locally with optional video conversi
 """
 
 import os
+import io
 import time
+import queue
 import threading
-from datetime import datetime
-from PIL import ImageGrab, Image
+import subprocess
+import shutil
+import json
+import random
+import collections
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import numpy as np
+from PIL import ImageGrab, Image, ImageDraw
 import argparse
 import signal
 import sys
 
+BACKPRESSURE_POLICIES = ("drop-oldest", "block")
+OUTPUT_MODES = ("stream", "hls", "frames")
+# Modes that pipe raw frames into a long-running FFmpeg process
+PIPED_OUTPUT_MODES = ("stream", "hls")
+
+VIDEO_FILE = "recording.mp4"
+# Streamed sessions are written here and renamed to VIDEO_FILE once FFmpeg exits cleanly
+STREAM_PARTIAL_FILE = "recording.part.mp4"
+# Remux target when salvaging a partial stream after a crash
+STREAM_RECOVERY_FILE = "recording.recovered.mp4"
+ENCODER_LOG_FILE = "encoder.log"
+# "hls" sessions write fMP4 segments and an event playlist here while recording, so the
+# viewer can play them live; they are remuxed into VIDEO_FILE when the session ends
+LIVE_DIR = "live"
+LIVE_PLAYLIST_FILE = "playlist.m3u8"
+LIVE_INIT_FILE = "init.mp4"
+LIVE_SEGMENT_SECONDS = 60
+# Stream keyframes, and so fragments and seek points, are forced this often; live segments
+# are cut on these keyframes
+KEYFRAME_SECONDS = LIVE_SEGMENT_SECONDS
+# One "<frame_number> <unix timestamp>" line per kept frame, used for variable-frame-rate output
+TIMESTAMP_INDEX_FILE = "timestamps.txt"
+CONCAT_LIST_FILE = "frames.ffconcat"
+# Per-session metadata written by the recorder so the viewer never has to probe the video
+MANIFEST_FILE = "session.json"
+MANIFEST_VERSION = 1
+MANIFEST_UPDATE_INTERVAL = 60  # seconds between manifest rewrites while recording
+# Named encoder settings. "palette" profiles reduce frames to 256 colours in an extra
+# FFmpeg pass before encoding; streaming can't do that and uses the video args alone.
+ENCODER_PROFILES = {
+    "fast": {
+        "description": "Single pass, x264 veryfast; cheapest to encode",
+        "palette": False,
+        "video_args": ["-c:v", "libx264", "-preset", "veryfast", "-tune", "stillimage", "-crf", "30",
+                       "-pix_fmt", "yuv420p"],
+    },
+    "palette": {
+        "description": "256-colour palette pass, then x264 medium (the original settings)",
+        "palette": True,
+        "video_args": ["-c:v", "libx264", "-preset", "medium", "-tune", "stillimage", "-crf", "30",
+                       "-pix_fmt", "yuv420p"],
+    },
+    "screen": {
+        "description": "Single pass x264 slow, tuned for text and flat UI areas",
+        "palette": False,
+        "video_args": ["-c:v", "libx264", "-preset", "slow", "-tune", "stillimage", "-crf", "28",
+                       "-x264-params", "aq-mode=3:ref=4", "-pix_fmt", "yuv420p"],
+    },
+    "hevc": {
+        "description": "Single pass x265; smaller files, slower encode, needs HEVC playback support",
+        "palette": False,
+        "video_args": ["-c:v", "libx265", "-preset", "medium", "-crf", "30", "-tag:v", "hvc1",
+                       "-pix_fmt", "yuv420p"],
+    },
+    "archive": {
+        "description": "Single pass x264 slow at a high CRF; small files for compacted old recordings",
+        "palette": False,
+        "video_args": ["-c:v", "libx264", "-preset", "slow", "-tune", "stillimage", "-crf", "36",
+                       "-pix_fmt", "yuv420p"],
+    },
+    "lossless": {
+        "description": "Lossless RGB x264 for archiving; large and not playable in most browsers",
+        "palette": False,
+        "video_args": ["-c:v", "libx264rgb", "-preset", "veryfast", "-qp", "0", "-pix_fmt", "rgb24"],
+    },
+}
+# Profile used when none is chosen: streaming must keep up in real time
+DEFAULT_ENCODER_PROFILES = {"stream": "fast", "hls": "fast", "frames": "palette"}
+
+# Compaction of old recordings: sessions older than --compact-after-days are re-encoded
+# smaller and each day merged into one session folder; staging and to-be-deleted folders
+# use these prefixes so the viewer and an interrupted run can tell them apart
+COMPACT_RESOLUTION = (854, 480)
+COMPACT_FPS = 0.2
+COMPACT_PROFILE = "archive"
+COMPACT_STAGING_PREFIX = ".compact_"
+COMPACT_TRASH_PREFIX = ".trash_"
+# A recording/encoding/converting manifest untouched for this long was left by a crashed
+# run, so it no longer keeps the compactor away from its day
+COMPACT_STALE_SECONDS = 3600
+# The viewer's cache of whole-day exports (<YYYY-MM-DD>_<digest>.mp4); it is rebuilt on demand,
+# so it doesn't count against the disk budget and goes with the day when the day is evicted
+EXPORT_CACHE_DIR = ".exports"
+SESSION_NAME_FORMAT = "%Y%m%d_%H%M%S"
+
+# Scrubbing thumbnails: one per SPRITE_INTERVAL seconds of video, packed into JPEG tiles
+# of SPRITE_COLUMNS x SPRITE_ROWS thumbnails, described by SPRITE_INDEX_FILE
+SPRITE_DIR = "sprites"
+SPRITE_INDEX_FILE = "sprites.json"
+SPRITE_INTERVAL = 60
+SPRITE_THUMB_SIZE = (160, 90)
+SPRITE_COLUMNS = 10
+SPRITE_ROWS = 10
+# Change detection compares grayscale thumbnails of this size
+CHANGE_THUMBNAIL_SIZE = (64, 36)
+# Per-frame activity: each captured frame's mean absolute thumbnail difference from the
+# previous captured frame (0-1), appended as packed little-endian records
+ACTIVITY_FILE = "activity.bin"
+ACTIVITY_DTYPE = np.dtype([("timestamp", "<u4"), ("score", "<f2")])
+
+# "quality" resizes with Lanczos; "fast" shrinks by an integer factor with reduce()
+# (a box average) and finishes with a bilinear resize of the much smaller image
+RESIZE_MODES = ("quality", "fast")
+# Per-frame stage timings keep this many recent samples for the rolling percentiles
+STAGES = ("grab", "resize", "convert", "encode", "write")
+STAGE_TIMING_WINDOW = 300
+
+# Prometheus textfile metrics: histogram bucket bounds in seconds, and how often the file is rewritten
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+JITTER_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+CONVERSION_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+METRICS_INTERVAL = 15
+
+# Where frames come from: the real screen, or generated desktop-like frames for headless
+# runs and benchmarks ("static" is mostly idle typing, "motion" adds a full-motion region)
+FRAME_SOURCES = ("screen", "static", "motion")
+# Synthetic sources pretend to be a row of this many displays when --displays asks for more than one
+SYNTHETIC_DISPLAYS = 3
+
+def niced(cmd, nice_level):
+    """Prefix a command with nice so it runs at lower priority; unchanged where nice isn't available"""
+    # A missing program is left to fail with FileNotFoundError as before, rather than as nice's exit 127
+    if not nice_level or not shutil.which("nice") or not shutil.which(cmd[0]):
+        return cmd
+    return ["nice", "-n", str(nice_level), *cmd]
+
+class ConversionQueue:
+    """Runs finished-session jobs (video conversion, encoder finalization) on background threads"""
+    def __init__(self, concurrency=1):
+        self.jobs = queue.Queue()
+        self.threads = []
+        for _ in range(max(1, concurrency)):
+            thread = threading.Thread(target=self.run, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, func, *args):
+        """Queue func(*args) to run on a conversion thread"""
+        self.jobs.put((func, args))
+
+    def run(self):
+        while True:
+            func, args = self.jobs.get()
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"❌ Error in background conversion: {e}")
+            finally:
+                self.jobs.task_done()
+
+    def pending(self):
+        """Number of queued jobs that haven't started yet"""
+        return self.jobs.qsize()
+
+    def join(self):
+        """Block until every queued job has finished"""
+        self.jobs.join()
+
+def downscale(image, size, resize_mode):
+    """Resize an image to size with a RESIZE_MODES method"""
+    if image.size == size:
+        return image
+    if resize_mode == "quality":
+        return image.resize(size, Image.Resampling.LANCZOS)
+    # Box-average by the largest whole factor that stays at or above the target size
+    # (2x on a 2560x1440 screen, 4x on 5K), then a cheap bilinear pass for the remainder
+    factor = min(image.width // size[0], image.height // size[1])
+    if factor >= 2:
+        image = image.reduce(factor)
+    if image.size == size:
+        return image
+    return image.resize(size, Image.Resampling.BILINEAR)
+
+class ScreenSource:
+    """Grabs the primary screen at native resolution, or with all_screens the whole desktop (optionally just bbox)"""
+    def __init__(self, bbox=None, all_screens=False):
+        self.bbox = bbox
+        self.all_screens = all_screens
+
+    def grab(self):
+        return ImageGrab.grab(bbox=self.bbox, all_screens=self.all_screens)
+
+Display = collections.namedtuple("Display", "name bbox")
+
+def list_displays():
+    """
+    Enumerate connected displays as Display(name, bbox) in desktop coordinates, in the order the
+    OS reports them (primary first). Returns [] where displays can't be listed.
+    """
+    if sys.platform == "darwin":
+        try:
+            import Quartz  # pyobjc-framework-Quartz
+        except ImportError:
+            return []
+        _, display_ids, count = Quartz.CGGetActiveDisplayList(16, None, None)
+        displays = []
+        for display_id in display_ids[:count]:
+            bounds = Quartz.CGDisplayBounds(display_id)
+            x, y = int(bounds.origin.x), int(bounds.origin.y)
+            displays.append(Display(f"display-{display_id}",
+                                    (x, y, x + int(bounds.size.width), y + int(bounds.size.height))))
+        return displays
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+        rects = []
+        callback_type = ctypes.WINFUNCTYPE(ctypes.c_int, wintypes.HMONITOR, wintypes.HDC,
+                                           ctypes.POINTER(wintypes.RECT), wintypes.LPARAM)
+
+        def collect(monitor, dc, rect, data):
+            rects.append((rect.contents.left, rect.contents.top, rect.contents.right, rect.contents.bottom))
+            return 1
+        ctypes.windll.user32.EnumDisplayMonitors(None, None, callback_type(collect), 0)
+        return [Display(f"monitor-{number}", rect) for number, rect in enumerate(rects)]
+    # X11: lines like " 0: +*DP-1 2560/597x1440/336+0+0  DP-1"
+    try:
+        output = subprocess.run(["xrandr", "--listmonitors"], capture_output=True, text=True, check=True).stdout
+    except (FileNotFoundError, subprocess.CalledProcessError):
+        return []
+    displays = []
+    for line in output.splitlines()[1:]:
+        fields = line.split()
+        try:
+            size, x, y = fields[2].split("+")
+            width, height = (int(value.split("/")[0]) for value in size.split("x"))
+            displays.append(Display(fields[-1], (int(x), int(y), int(x) + width, int(y) + height)))
+        except (IndexError, ValueError):
+            continue
+    return displays
+
+def fit_size(size, box):
+    """The largest even-sized (width, height) with size's aspect ratio that fits in box"""
+    scale = min(box[0] / size[0], box[1] / size[1], 1.0)
+    return (max(2, int(size[0] * scale) // 2 * 2), max(2, int(size[1] * scale) // 2 * 2))
+
+class MultiDisplaySource:
+    """
+    Captures several displays at the same tick and tiles them left to right into one frame.
+    Each display is grabbed and downscaled to its own tile size on a thread pool; a display with
+    a lower rate than the recorder is only grabbed every few ticks, and its last tile is reused
+    in between. With desktop set, the whole desktop is grabbed once per tick and each display is
+    cropped from it instead, for platforms where a region grab captures everything anyway.
+    """
+    def __init__(self, displays, sources, tile_sizes, every, resize_mode="quality", desktop=None, desktop_origin=(0, 0)):
+        self.displays = displays
+        self.sources = sources
+        self.tile_sizes = tile_sizes
+        self.every = every
+        self.resize_mode = resize_mode
+        self.desktop = desktop
+        self.desktop_origin = desktop_origin
+        self.pool = ThreadPoolExecutor(max_workers=len(displays), thread_name_prefix="display")
+        self.tiles = [None] * len(displays)
+        self.tick = 0
+        width = sum(tile[0] for tile in tile_sizes)
+        height = max(tile[1] for tile in tile_sizes)
+        self.output_size = (width, height)
+        # Where each display sits in the frame, as fractions so it survives later rescaling
+        self.layout, x = [], 0
+        for display, (tile_width, tile_height), every_n in zip(displays, tile_sizes, every):
+            self.layout.append({
+                "name": display.name,
+                "box": [round(x / width, 4), 0.0, round((x + tile_width) / width, 4), round(tile_height / height, 4)],
+                "width": tile_width,
+                "height": tile_height,
+                "every_n_frames": every_n,
+            })
+            x += tile_width
+
+    def capture_tile(self, number, desktop_image):
+        if desktop_image is not None:
+            left, top = self.desktop_origin
+            x0, y0, x1, y1 = self.displays[number].bbox
+            image = desktop_image.crop((x0 - left, y0 - top, x1 - left, y1 - top))
+        else:
+            image = self.sources[number].grab()
+        return downscale(image, self.tile_sizes[number], self.resize_mode)
+
+    def grab(self):
+        due = [n for n in range(len(self.displays)) if self.tiles[n] is None or self.tick % self.every[n] == 0]
+        self.tick += 1
+        desktop_image = self.desktop.grab() if self.desktop is not None else None
+        for number, tile in zip(due, self.pool.map(lambda n: self.capture_tile(n, desktop_image), due)):
+            self.tiles[number] = tile
+        frame = Image.new("RGB", self.output_size)
+        x = 0
+        for tile in self.tiles:
+            frame.paste(tile, (x, 0))
+            x += tile.width
+        return frame
+
+class SyntheticSource:
+    """
+    Generates desktop-like frames: a few static windows full of text lines, with typing in one
+    and an occasional scroll in another. With motion=True a video-like region changes every
+    frame and a window drifts across the screen, which defeats change detection and stresses
+    the encoder. Seeded, so runs are repeatable.
+    """
+    def __init__(self, size=(2560, 1440), motion=False, seed=0):
+        self.size = size
+        self.motion = motion
+        self.rng = random.Random(seed)
+        self.noise = np.random.default_rng(seed)
+        self.frame_number = 0
+        width, height = size
+        self.desktop = Image.new("RGB", size, (52, 73, 94))
+        draw = ImageDraw.Draw(self.desktop)
+        self.windows = []
+        for _ in range(3):
+            x0, y0 = self.rng.randrange(0, width // 2), self.rng.randrange(0, height // 2)
+            x1 = min(width - 1, x0 + self.rng.randrange(width // 3, width // 2))
+            y1 = min(height - 1, y0 + self.rng.randrange(height // 3, height // 2))
+            self.draw_window(draw, (x0, y0, x1, y1))
+            self.windows.append((x0 + 8, y0 + 28, x1 - 8, y1 - 8))
+        self.cursor = [self.windows[0][0], self.windows[0][1]]
+
+    def draw_window(self, draw, box):
+        x0, y0, x1, y1 = box
+        draw.rectangle(box, fill=(250, 250, 250), outline=(180, 180, 180))
+        draw.rectangle((x0, y0, x1, y0 + 20), fill=(225, 225, 230))
+        for y in range(y0 + 28, y1 - 12, 14):
+            draw.line((x0 + 8, y, x0 + 8 + self.rng.randrange(20, max(21, x1 - x0 - 16)), y), fill=(60, 60, 60), width=6)
+
+    def grab(self):
+        # Typing: a few characters per frame, drawn into the persistent desktop
+        draw = ImageDraw.Draw(self.desktop)
+        left, top, right, bottom = self.windows[0]
+        for _ in range(self.rng.randrange(0, 6)):
+            x, y = self.cursor
+            draw.rectangle((x, y, x + 6, y + 8), fill=(30, 30, 30))
+            self.cursor[0] += 8
+            if self.cursor[0] > right - 8:
+                self.cursor = [left, y + 14 if y + 24 < bottom else top]
+        # Occasional scroll of the second window
+        if self.frame_number % 20 == 19:
+            left, top, right, bottom = self.windows[1]
+            self.desktop.paste(self.desktop.crop((left, top + 42, right, bottom)), (left, top))
+        self.frame_number += 1
+        if not self.motion:
+            return self.desktop.copy()
+
+        frame = self.desktop.copy()
+        width, height = self.size
+        region = (width // 3, height // 3)
+        pixels = self.noise.integers(0, 256, (region[1], region[0], 3), dtype=np.uint8)
+        frame.paste(Image.fromarray(pixels), (width // 2, height // 2))
+        offset = (self.frame_number * 16) % max(1, width - width // 4)
+        self.draw_window(ImageDraw.Draw(frame), (offset, height // 8, offset + width // 4, height // 8 + height // 4))
+        return frame
+
+def make_frame_source(name, size=(2560, 1440), displays=None, tile_sizes=None, display_fps=None, fps=1,
+                      resize_mode="quality"):
+    """
+    Build a frame source from its FRAME_SOURCES name; size applies to synthetic sources.
+    displays selects what to capture: None or "primary" for the main screen only, "all", or a list
+    of display numbers. For more than one display, tile_sizes bounds each display's tile (one
+    (width, height) for all, or one per display) and display_fps caps each display's capture rate.
+    """
+    if name not in FRAME_SOURCES:
+        raise ValueError(f"Unknown frame source: {name}")
+    synthetic = name != "screen"
+    if displays in (None, "primary"):
+        return SyntheticSource(size, motion=name == "motion") if synthetic else ScreenSource()
+
+    if synthetic:
+        available = [Display(f"synthetic-{n}", (n * size[0], 0, (n + 1) * size[0], size[1]))
+                     for n in range(SYNTHETIC_DISPLAYS)]
+    else:
+        available = list_displays()
+        if not available:
+            print("⚠️  Could not list displays; recording the primary display only")
+            return ScreenSource()
+    if displays == "all":
+        selected = available
+    else:
+        unknown = [n for n in displays if not 0 <= n < len(available)]
+        if unknown:
+            raise ValueError(f"No display {unknown[0]}; found {len(available)}: "
+                             + ", ".join(f"{n}={d.name}" for n, d in enumerate(available)))
+        selected = [available[n] for n in displays]
+    if len(selected) == 1 and not synthetic:
+        return ScreenSource(selected[0].bbox, all_screens=True)
+
+    def per_display(values, default):
+        values = values or [default]
+        if len(values) not in (1, len(selected)):
+            raise ValueError(f"Expected 1 or {len(selected)} per-display values, got {len(values)}")
+        return values * len(selected) if len(values) == 1 else values
+    boxes = per_display(tile_sizes, (1280, 720))
+    rates = per_display(display_fps, fps)
+    if min(rates) <= 0:
+        raise ValueError("Display capture rates must be positive")
+    tiles = [fit_size((d.bbox[2] - d.bbox[0], d.bbox[3] - d.bbox[1]), box) for d, box in zip(selected, boxes)]
+    every = [max(1, round(fps / min(rate, fps))) for rate in rates]
+
+    if synthetic:
+        sources = [SyntheticSource(size, motion=name == "motion", seed=n) for n in range(len(selected))]
+        return MultiDisplaySource(selected, sources, tiles, every, resize_mode)
+    if sys.platform == "darwin":
+        # screencapture grabs just the requested region, so displays really are captured in parallel
+        return MultiDisplaySource(selected, [ScreenSource(d.bbox, all_screens=True) for d in selected], tiles, every,
+                                  resize_mode)
+    # Elsewhere a region grab still reads the whole desktop, so read it once and crop; the
+    # desktop image starts at the top-left corner of all displays, selected or not
+    origin = (min(d.bbox[0] for d in available), min(d.bbox[1] for d in available))
+    return MultiDisplaySource(selected, None, tiles, every, resize_mode,
+                              desktop=ScreenSource(all_screens=True), desktop_origin=origin)
+
+class Histogram:
+    """Thread-safe cumulative histogram rendered in the Prometheus text format"""
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        with self.lock:
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    break
+            else:
+                i = len(self.buckets)
+            self.counts[i] += 1
+            self.sum += value
+
+    def render(self, name, labels=""):
+        """Return the _bucket/_sum/_count sample lines; labels is e.g. 'stage="grab"'"""
+        with self.lock:
+            counts, total = list(self.counts), self.sum
+        prefix = f"{labels}," if labels else ""
+        lines, cumulative = [], 0
+        for bound, count in zip(list(self.buckets) + ["+Inf"], counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {total:.6f}")
+        lines.append(f"{name}_count{suffix} {cumulative}")
+        return lines
+
+class StageTimers:
+    """Rolling per-stage durations, shared by the capture, worker and writer threads"""
+    def __init__(self, stages=STAGES, window=STAGE_TIMING_WINDOW):
+        self.lock = threading.Lock()
+        self.samples = {stage: collections.deque(maxlen=window) for stage in stages}
+        # Cumulative counterpart of the rolling window, for the metrics file
+        self.histograms = {stage: Histogram(STAGE_BUCKETS) for stage in stages}
+
+    @contextmanager
+    def time(self, stage):
+        """Time the body of a with-block as one sample of stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def record(self, stage, seconds):
+        with self.lock:
+            self.samples[stage].append(seconds)
+        self.histograms[stage].observe(seconds)
+
+    def percentiles(self):
+        """{stage: {"p50_ms", "p95_ms", "p99_ms", "n"}} over the recent window, for stages with samples"""
+        with self.lock:
+            snapshot = {stage: list(samples) for stage, samples in self.samples.items() if samples}
+        result = {}
+        for stage, samples in snapshot.items():
+            p50, p95, p99 = (float(p) * 1000 for p in np.percentile(samples, [50, 95, 99]))
+            result[stage] = {"p50_ms": round(p50, 2), "p95_ms": round(p95, 2), "p99_ms": round(p99, 2),
+                             "n": len(samples)}
+        return result
+
+    def summary(self):
+        """One line of p50/p95 per stage, e.g. 'grab 41.2/55.0ms  resize 12.1/13.4ms'"""
+        return "  ".join(f"{stage} {stats['p50_ms']:.1f}/{stats['p95_ms']:.1f}ms"
+                         for stage, stats in self.percentiles().items())
+
 class ScreenRecorder:
-    def __init__(self, fps=0.5, resolution=(1280, 720), output_dir="recordings", auto_convert=True):
+    def __init__(self, fps=0.5, resolution=(1280, 720), output_dir="recordings", auto_convert=True,
+                 pipeline=False, workers=2, queue_size=8, backpressure="drop-oldest", output_mode="stream",
+                 change_threshold=0.0, rotate_interval=None, convert_workers=1, nice_level=10,
+                 sprites=True, encoder_profile=None, resize_mode="quality", show_timings=False,
+                 metrics_file=None, frame_source=None, compactor=None, activity=True):
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unknown backpressure policy: {backpressure}")
+        if output_mode not in OUTPUT_MODES:
+            raise ValueError(f"Unknown output mode: {output_mode}")
+        if encoder_profile is not None and encoder_profile not in ENCODER_PROFILES:
+            raise ValueError(f"Unknown encoder profile: {encoder_profile}")
+        if resize_mode not in RESIZE_MODES:
+            raise ValueError(f"Unknown resize mode: {resize_mode}")
+
         self.fps = fps
-        self.resolution = resolution
+        self.resize_mode = resize_mode
+        # Anything with a grab() returning a PIL image; the real screen unless told otherwise
+        self.frame_source = frame_source or ScreenSource()
+        # A multi-display source composes frames at its own size
+        self.resolution = getattr(self.frame_source, "output_size", None) or resolution
         self.output_dir = output_dir
         self.auto_convert = auto_convert
         self.recording = False
         self.frames = []
+        self.total_frames = 0
         self.current_session = None
+
+        # Start a new session every rotate_interval seconds without stopping capture;
+        # finished sessions are handed to the conversion queue.
+        self.rotate_interval = rotate_interval
+        self.session_deadline = None
+        self.nice_level = nice_level
+        self.converter = ConversionQueue(convert_workers)
+        # Sessions still being recorded or finished by this process; the compactor skips their days
+        self.active_sessions = collections.Counter()
+        self.active_lock = threading.Lock()
+        # Optional Compactor, kicked off at start and after every finished session
+        self.compactor = compactor
+        self.sprites = sprites
+        self.encoder_profile = encoder_profile
+
+        # Pipelined capture settings (grab -> resize/encode pool -> disk writer)
+        self.pipeline = pipeline
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.backpressure = backpressure
+        self.stop_event = threading.Event()
+        self.stats_lock = threading.Lock()
+        self.dropped_frames = 0
+        self.late_frames = 0
+
+        # Rolling grab/resize/convert/encode/write timings; printed with progress when show_timings
+        self.timers = StageTimers()
+        self.show_timings = show_timings
+
+        # Prometheus textfile (e.g. for node_exporter's textfile collector), rewritten every METRICS_INTERVAL
+        self.metrics_file = metrics_file
+        self.tick_jitter = Histogram(JITTER_BUCKETS)
+        self.conversion_seconds = Histogram(CONVERSION_BUCKETS)
+        self.conversion_failures = 0
+        self.bytes_written = 0
+        self.last_frame_at = 0.0
+        self.frame_queue = None
+
+        # "stream" pipes raw frames into one FFmpeg per session; "hls" does the same but writes
+        # live segments; "frames" writes JPEGs and converts them afterwards. session_mode is what the current session actually uses.
+        self.output_mode = output_mode
+        self.session_mode = output_mode
+        self.encoder_process = None
+        self.encoder_log = None
+        # Set when the session's FFmpeg stops accepting frames (crash, disk full): the session
+        # ends and the next one records JPEG frames instead
+        self.encoder_died = False
+
+        # Frames whose mean absolute thumbnail difference from the last kept frame is
+        # below change_threshold (0-1 scale) are skipped; 0 keeps every frame.
+        self.change_threshold = change_threshold
+        self.last_thumbnail = None
+        self.skipped_frames = 0
+        self.index_file = None
+
+        # Activity scores use the same thumbnails, compared with the previous captured frame
+        self.activity = activity
+        self.activity_file = None
+        self.previous_thumbnail = None
+
+        # Manifest of the session being recorded, and the counters when it started
+        self.manifest = None
+        self.manifest_written_at = 0
+        self.session_counters_start = (0, 0, 0)
         
         # Create output directory
         os.makedirs(output_dir, exist_ok=True)
@@ -30,7 +600,7 @@ class ScreenRecorder:
         signal.signal(signal.SIGINT, self.signal_handler)
         signal.signal(signal.SIGTERM, self.signal_handler)
 
-        # Attempt to recover any incomplete sessions from previous runs
+        # Queue recovery of incomplete sessions from previous runs; capture doesn't wait for it
         self.recover_incomplete_sessions()
     
     def signal_handler(self, signum, frame):
@@ -39,59 +609,760 @@ class ScreenRecorder:
         self.stop_recording()
         sys.exit(0)
     
+    def grab_screen(self):
+        """Grab the full screen at native resolution"""
+        try:
+            with self.timers.time("grab"):
+                return self.frame_source.grab()
+        except Exception as e:
+            print(f"❌ Error capturing screenshot: {e}")
+            return None
+
+    def resize_frame(self, screenshot):
+        """Resize a raw screenshot to the target resolution"""
+        with self.timers.time("resize"):
+            return downscale(screenshot, self.resolution, self.resize_mode)
+
     def capture_screenshot(self):
         """Capture and resize screenshot"""
+        screenshot = self.grab_screen()
+        if screenshot is None:
+            return None
         try:
-            # Capture full screen
-            screenshot = ImageGrab.grab()
-            
             # Resize to target resolution for efficiency
-            screenshot = screenshot.resize(self.resolution, Image.Resampling.LANCZOS)
-            
-            return screenshot
+            return self.resize_frame(screenshot)
         except Exception as e:
             print(f"❌ Error capturing screenshot: {e}")
             return None
-    
+
+    def encode_frame(self, frame):
+        """Encode a frame to JPEG bytes, or raw RGB bytes when streaming"""
+        # Convert to RGB to remove alpha channel, which JPEG and rawvideo rgb24 don't carry
+        with self.timers.time("convert"):
+            rgb_frame = frame.convert("RGB")
+        with self.timers.time("encode"):
+            if self.session_mode in PIPED_OUTPUT_MODES:
+                return rgb_frame.tobytes()
+            buffer = io.BytesIO()
+            # Save with high compression for smaller file size
+            rgb_frame.save(buffer, "JPEG", quality=60, optimize=True)
+            return buffer.getvalue()
+
+    def write_frame(self, data, session_dir, frame_number):
+        """Write encoded frame bytes to the session directory, or to the encoder when streaming"""
+        with self.timers.time("write"):
+            if self.session_mode in PIPED_OUTPUT_MODES:
+                self.encoder_process.stdin.write(data)
+                self.bytes_written += len(data)
+                return None
+            filename = f"frame_{frame_number:06d}.jpg"
+            filepath = os.path.join(session_dir, filename)
+            with open(filepath, "wb") as f:
+                f.write(data)
+            self.bytes_written += len(data)
+            return filepath
+
     def save_frame(self, frame, session_dir, frame_number):
         """Save individual frame"""
-        filename = f"frame_{frame_number:06d}.jpg"
-        filepath = os.path.join(session_dir, filename)
-        
-        # Convert to RGB to remove alpha channel, which JPEG doesn't support
-        rgb_frame = frame.convert("RGB")
-        # Save with high compression for smaller file size
-        rgb_frame.save(filepath, "JPEG", quality=60, optimize=True)
-        return filepath
-    
+        return self.write_frame(self.encode_frame(frame), session_dir, frame_number)
+
+    def frame_ticks(self):
+        """
+        Yield once per frame period on a monotonic clock.
+        Deadlines are absolute, so a slow iteration doesn't shift the schedule; ticks that
+        are missed entirely are skipped and counted as late frames.
+        """
+        period = 1.0 / self.fps
+        next_tick = time.monotonic()
+        while self.recording:
+            if self.session_deadline is not None and next_tick >= self.session_deadline:
+                return
+            now = time.monotonic()
+            if now < next_tick:
+                if self.stop_event.wait(next_tick - now):
+                    return
+            elif now - next_tick >= period:
+                missed = int((now - next_tick) // period)
+                with self.stats_lock:
+                    self.late_frames += missed
+                next_tick += missed * period
+            self.tick_jitter.observe(max(0.0, time.monotonic() - next_tick))
+            yield
+            next_tick += period
+
+    def log_progress(self, frame_number):
+        """Print a progress line every 30 frames"""
+        if frame_number % 30 == 0 and frame_number > 0:
+            print(f"📸 Captured {frame_number} frames")
+            if self.show_timings:
+                print(f"   ⏱️  p50/p95 {self.timers.summary()}")
+
     def recording_loop(self):
-        """Main recording loop"""
-        frame_number = 0
-        session_name = datetime.now().strftime("%Y%m%d_%H%M%S")
-        session_dir = os.path.join(self.output_dir, session_name)
-        os.makedirs(session_dir, exist_ok=True)
+        """Main recording loop, rotating to a new session whenever the current one runs out"""
+        while self.recording:
+            self.record_session()
+
+    def record_session(self):
+        """Record one session until recording stops or the rotation interval elapses"""
+        self.session_deadline = time.monotonic() + self.rotate_interval if self.rotate_interval else None
+        while True:
+            session_name = datetime.now().strftime("%Y%m%d_%H%M%S")
+            session_dir = os.path.join(self.output_dir, session_name)
+            try:
+                os.makedirs(session_dir)
+                break
+            except FileExistsError:
+                # A session that ended early started this same second; names are per second
+                time.sleep(1 - time.time() % 1)
         
         self.current_session = session_dir
+        self.mark_active(session_dir, 1)
         print(f"📁 Recording to: {session_dir}")
-        
-        while self.recording:
-            start_time = time.time()
-            
+
+        self.session_mode = self.output_mode
+        if self.encoder_died:
+            # Don't restart an encoder that just died; the session after this one tries again
+            self.encoder_died = False
+            if self.session_mode in PIPED_OUTPUT_MODES:
+                print("   ↩️  Previous encoder died; recording JPEG frames + conversion for this session.")
+                self.session_mode = "frames"
+        if self.session_mode in PIPED_OUTPUT_MODES and not self.start_encoder(session_dir):
+            print("   ↩️  Falling back to JPEG frames + conversion.")
+            self.session_mode = "frames"
+
+        self.frames = []
+        self.last_thumbnail = None
+        self.previous_thumbnail = None
+        self.index_file = open(os.path.join(session_dir, TIMESTAMP_INDEX_FILE), "a")
+        if self.activity:
+            self.activity_file = open(os.path.join(session_dir, ACTIVITY_FILE), "ab")
+        self.start_manifest(session_dir, session_name)
+        try:
+            if self.pipeline:
+                self.pipelined_loop(session_dir)
+            else:
+                self.sequential_loop(session_dir)
+        finally:
+            self.index_file.close()
+            self.index_file = None
+            if self.activity_file:
+                self.activity_file.close()
+                self.activity_file = None
+            self.finish_session(session_dir)
+
+    def finish_session(self, session_dir):
+        """Hand a finished session to the conversion queue"""
+        if self.recording:
+            print(f"🔁 Rotating session after {len(self.frames)} frames.")
+        if self.session_mode in PIPED_OUTPUT_MODES:
+            status = "encoding"
+        elif self.auto_convert and self.frames:
+            status = "converting"
+        else:
+            status = "recorded"
+        self.update_manifest(session_dir, status=status, ended_at=datetime.now().astimezone().isoformat(timespec="seconds"),
+                             end_timestamp=round(time.time(), 3))
+
+        if self.session_mode in PIPED_OUTPUT_MODES:
+            process, log = self.encoder_process, self.encoder_log
+            self.encoder_process = None
+            self.encoder_log = None
+            if process is not None:
+                # Closing stdin now lets FFmpeg flush while the next session records
+                try:
+                    process.stdin.close()
+                except BrokenPipeError:
+                    pass
+                self.submit_session_job(session_dir, self.finish_encoder, session_dir, process, log,
+                                        len(self.frames), self.session_mode)
+        elif self.auto_convert and self.frames:
+            self.submit_session_job(session_dir, self.convert_to_video, session_dir)
+        self.mark_active(session_dir, -1)
+        if self.compactor:
+            self.compactor.start(self)
+
+    def mark_active(self, session_dir, delta):
+        with self.active_lock:
+            self.active_sessions[session_dir] += delta
+            if self.active_sessions[session_dir] <= 0:
+                del self.active_sessions[session_dir]
+
+    def session_is_active(self, session_dir):
+        with self.active_lock:
+            return session_dir in self.active_sessions
+
+    def submit_session_job(self, session_dir, func, *args):
+        """Queue a job that finishes a session, keeping the session marked active until it's done"""
+        self.mark_active(session_dir, 1)
+        def job():
+            try:
+                func(*args)
+            finally:
+                self.mark_active(session_dir, -1)
+        self.converter.submit(job)
+
+    def read_manifest(self, session_dir):
+        """Read a session's manifest, or None if it has none"""
+        try:
+            with open(os.path.join(session_dir, MANIFEST_FILE)) as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def write_manifest(self, session_dir, manifest):
+        """Atomically write a session's manifest"""
+        manifest_path = os.path.join(session_dir, MANIFEST_FILE)
+        tmp_path = manifest_path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(tmp_path, manifest_path)
+        except OSError as e:
+            print(f"❌ Error writing manifest for {session_dir}: {e}")
+
+    def start_manifest(self, session_dir, session_name):
+        """Write the initial manifest for a session that is starting to record"""
+        now = datetime.now().astimezone()
+        with self.stats_lock:
+            self.session_counters_start = (self.dropped_frames, self.late_frames, self.skipped_frames)
+        self.manifest = {
+            "version": MANIFEST_VERSION,
+            "session": session_name,
+            "status": "recording",
+            "started_at": now.isoformat(timespec="seconds"),
+            "start_timestamp": round(now.timestamp(), 3),
+            "ended_at": None,
+            "end_timestamp": None,
+            "fps": self.fps,
+            "width": self.resolution[0],
+            "height": self.resolution[1],
+            "output_mode": self.session_mode,
+            # Streams only get real timestamps when frames can be skipped
+            "variable_frame_rate": self.session_mode == "frames" or self.change_threshold > 0,
+            "change_threshold": self.change_threshold,
+            "encoder_profile": self.profile_for(self.session_mode),
+            # Tile of each display in the frame when several are recorded
+            "displays": getattr(self.frame_source, "layout", None),
+            "frame_count": 0,
+            "dropped_frames": 0,
+            "late_frames": 0,
+            "skipped_frames": 0,
+            "video_file": None,
+            "video_size": None,
+            "duration": None,
+            "encode_seconds": None,
+        }
+        self.write_manifest(session_dir, self.manifest)
+        self.manifest_written_at = time.monotonic()
+
+    def update_manifest(self, session_dir, **fields):
+        """Refresh the current session's frame counters (plus any given fields) and rewrite its manifest"""
+        with self.stats_lock:
+            dropped, late, skipped = self.session_counters_start
+            self.manifest.update(
+                frame_count=len(self.frames),
+                dropped_frames=self.dropped_frames - dropped,
+                late_frames=self.late_frames - late,
+                skipped_frames=self.skipped_frames - skipped,
+            )
+        self.manifest.update(fields)
+        self.write_manifest(session_dir, self.manifest)
+        self.manifest_written_at = time.monotonic()
+
+    def finalize_manifest(self, session_dir, encode_seconds, duration=None, **fields):
+        """Record the finished video in a session's manifest, creating one for legacy sessions.
+        The duration is worked out from the frames unless the caller measured it."""
+        manifest = self.read_manifest(session_dir) or self.legacy_manifest(session_dir)
+        output_file = os.path.join(session_dir, VIDEO_FILE)
+        entries = self.read_timestamp_index(session_dir)
+        if entries:
+            # The index is always current; periodic manifest updates may lag after a crash
+            manifest["frame_count"] = len(entries)
+        if duration is not None:
+            pass
+        elif manifest.get("variable_frame_rate") and entries:
+            duration = entries[-1][1] - entries[0][1] + 1.0 / manifest["fps"]
+        else:
+            duration = manifest["frame_count"] / manifest["fps"]
+        manifest.update(
+            status="complete",
+            video_file=VIDEO_FILE,
+            video_size=os.path.getsize(output_file),
+            duration=round(duration, 3),
+            encode_seconds=round(encode_seconds, 3),
+            **fields,
+        )
+        self.write_manifest(session_dir, manifest)
+
+    def fail_manifest(self, session_dir, error):
+        """Mark a session whose video could not be produced, so it isn't left looking in progress"""
+        manifest = self.read_manifest(session_dir) or self.legacy_manifest(session_dir)
+        manifest.update(status="failed", error=error)
+        self.write_manifest(session_dir, manifest)
+
+    def legacy_manifest(self, session_dir):
+        """Build a manifest for a session recorded before manifests existed"""
+        session_name = os.path.basename(os.path.normpath(session_dir))
+        frame_files = sorted(f for f in os.listdir(session_dir) if f.startswith('frame_') and f.endswith('.jpg'))
+        try:
+            started = datetime.strptime(session_name, "%Y%m%d_%H%M%S").astimezone()
+        except ValueError:
+            started = datetime.fromtimestamp(os.path.getmtime(session_dir)).astimezone()
+        width, height = self.resolution
+        if frame_files:
+            with Image.open(os.path.join(session_dir, frame_files[0])) as first_frame:
+                width, height = first_frame.size
+        return {
+            "version": MANIFEST_VERSION,
+            "session": session_name,
+            "status": "recorded",
+            "started_at": started.isoformat(timespec="seconds"),
+            "start_timestamp": round(started.timestamp(), 3),
+            "ended_at": None,
+            "end_timestamp": None,
+            "fps": self.fps,
+            "width": width,
+            "height": height,
+            "output_mode": "frames",
+            "variable_frame_rate": bool(self.read_timestamp_index(session_dir)),
+            "change_threshold": None,
+            "encoder_profile": None,
+            "frame_count": len(frame_files),
+            "dropped_frames": None,
+            "late_frames": None,
+            "skipped_frames": None,
+            "video_file": None,
+            "video_size": None,
+            "duration": None,
+            "encode_seconds": None,
+        }
+
+    def profile_for(self, mode):
+        """Name of the encoder profile used for sessions recorded in the given output mode"""
+        return self.encoder_profile or DEFAULT_ENCODER_PROFILES[mode]
+
+    def generate_sprites(self, session_dir):
+        """Build scrubbing sprite sheets for a session's finished video"""
+        manifest = self.read_manifest(session_dir) or {}
+        video_file = os.path.join(session_dir, VIDEO_FILE)
+        sprite_dir = os.path.join(session_dir, SPRITE_DIR)
+        if not self.sprites or not manifest.get("duration") or not os.path.exists(video_file):
+            return
+        os.makedirs(sprite_dir, exist_ok=True)
+
+        thumb_width, thumb_height = SPRITE_THUMB_SIZE
+        cmd = [
+            "ffmpeg", "-y",
+            "-loglevel", "error",
+            "-i", video_file,
+            "-vf", (f"fps=1/{SPRITE_INTERVAL},"
+                    f"scale={thumb_width}:{thumb_height}:force_original_aspect_ratio=decrease,"
+                    f"pad={thumb_width}:{thumb_height}:(ow-iw)/2:(oh-ih)/2,"
+                    f"tile={SPRITE_COLUMNS}x{SPRITE_ROWS}"),
+            "-q:v", "5",
+            os.path.join(sprite_dir, "sprite_%03d.jpg")
+        ]
+        try:
+            subprocess.run(niced(cmd, self.nice_level), capture_output=True, check=True,
+                           stdin=subprocess.DEVNULL)
+        except FileNotFoundError:
+            print("❌ FFmpeg not found. Skipping sprite generation.")
+            return
+        except subprocess.CalledProcessError as e:
+            print(f"❌ FFmpeg error during sprite generation: {e.stderr.decode(errors='replace')}")
+            return
+
+        video_stat = os.stat(video_file)
+        tiles = sorted(f for f in os.listdir(sprite_dir) if f.startswith("sprite_") and f.endswith(".jpg"))
+        index = {
+            "interval": SPRITE_INTERVAL,
+            "thumb_width": thumb_width,
+            "thumb_height": thumb_height,
+            "columns": SPRITE_COLUMNS,
+            "rows": SPRITE_ROWS,
+            "count": int(manifest["duration"] // SPRITE_INTERVAL) + 1,
+            "tiles": tiles,
+            # Lets the viewer tell whether the sprites still match the video
+            "video_mtime": video_stat.st_mtime,
+            "video_size": video_stat.st_size,
+        }
+        tmp_path = os.path.join(sprite_dir, SPRITE_INDEX_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, os.path.join(sprite_dir, SPRITE_INDEX_FILE))
+        print(f"🖼️  Generated {len(tiles)} sprite sheet(s) for {session_dir}")
+
+    def start_encoder(self, session_dir):
+        """Start a long-running FFmpeg process that encodes raw RGB frames from stdin"""
+        width, height = self.resolution
+        # With change detection frames arrive irregularly, so stamp them on arrival
+        # instead of assuming a constant rate
+        timing_args = ["-use_wallclock_as_timestamps", "1"] if self.change_threshold > 0 else []
+        cmd = [
+            "ffmpeg", "-y",
+            "-loglevel", "error",
+            "-f", "rawvideo",
+            "-pix_fmt", "rgb24",
+            "-s", f"{width}x{height}",
+            "-framerate", str(self.fps),
+            *timing_args,
+            "-i", "-",
+            *ENCODER_PROFILES[self.profile_for(self.session_mode)]["video_args"],
+            "-g", str(max(1, round(self.fps * KEYFRAME_SECONDS))),
+            # Keyframe (and fragment, or live segment) every minute of capture time: -g counts
+            # frames, which change detection may space minutes apart
+            "-force_key_frames", f"expr:gte(t,n_forced*{KEYFRAME_SECONDS})",
+            "-fps_mode", "vfr" if self.change_threshold > 0 else "cfr",
+        ]
+        if self.session_mode == "hls":
+            live_dir = os.path.join(session_dir, LIVE_DIR)
+            os.makedirs(live_dir, exist_ok=True)
+            cmd += [
+                "-f", "hls",
+                "-hls_time", str(LIVE_SEGMENT_SECONDS),
+                # "event" keeps every segment listed, so the whole session stays seekable while live
+                "-hls_playlist_type", "event",
+                "-hls_segment_type", "fmp4",
+                "-hls_fmp4_init_filename", LIVE_INIT_FILE,
+                "-hls_segment_filename", os.path.join(live_dir, "segment_%05d.m4s"),
+                # Segments appear under their final name only once complete
+                "-hls_flags", "independent_segments+temp_file",
+                os.path.join(live_dir, LIVE_PLAYLIST_FILE)
+            ]
+        else:
+            cmd += [
+                # Fragmented MP4 stays playable up to the last fragment if the recorder dies
+                "-movflags", "frag_keyframe+empty_moov+default_base_moof",
+                "-f", "mp4",
+                os.path.join(session_dir, STREAM_PARTIAL_FILE)
+            ]
+        try:
+            self.encoder_log = open(os.path.join(session_dir, ENCODER_LOG_FILE), "wb")
+            # In its own session, so Ctrl+C (SIGINT to the whole process group) only reaches the
+            # recorder, which then closes stdin and lets FFmpeg finish the file
+            self.encoder_process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=self.encoder_log,
+                                                    start_new_session=True)
+            print("🎥 Streaming frames to FFmpeg." if self.session_mode == "stream"
+                  else f"📡 Writing {LIVE_SEGMENT_SECONDS}s live segments to {LIVE_DIR}/.")
+            return True
+        except FileNotFoundError:
+            print("❌ FFmpeg not found. Please install FFmpeg to stream video.")
+            print("   Install with: brew install ffmpeg")
+        except Exception as e:
+            print(f"❌ Error starting FFmpeg: {e}")
+        if self.encoder_log:
+            self.encoder_log.close()
+            self.encoder_log = None
+        return False
+
+    def finish_encoder(self, session_dir, process, log, frame_count, mode="stream"):
+        """Wait for a session's FFmpeg process to finalize and publish the video"""
+        started = time.monotonic()
+        returncode = process.wait()
+        log.close()
+
+        log_path = os.path.join(session_dir, ENCODER_LOG_FILE)
+        partial_file = os.path.join(session_dir, STREAM_PARTIAL_FILE)
+        output_file = os.path.join(session_dir, VIDEO_FILE)
+        if returncode != 0:
+            print(f"❌ FFmpeg exited with code {returncode}, see {log_path}")
+            self.conversion_failures += 1
+            self.fail_manifest(session_dir, f"FFmpeg exited with code {returncode}")
+            return
+        if mode == "hls":
+            if not frame_count or not self.publish_live_segments(session_dir):
+                print(f"ℹ️ No live segments to publish in {session_dir}.")
+                self.fail_manifest(session_dir, "no live segments to publish")
+                return
+        elif not os.path.exists(partial_file) or not frame_count:
+            print(f"ℹ️ No frames were streamed in {session_dir}.")
+            self.fail_manifest(session_dir, "no frames were streamed")
+            return
+        else:
+            os.replace(partial_file, output_file)
+        os.remove(log_path)
+        self.conversion_seconds.observe(time.monotonic() - started)
+        self.finalize_manifest(session_dir, time.monotonic() - started)
+        print(f"✅ Video saved: {output_file}")
+        video_size = os.path.getsize(output_file) / (1024 * 1024)
+        print(f"📊 Video size: {video_size:.1f} MB")
+        self.generate_sprites(session_dir)
+
+    def publish_live_segments(self, session_dir):
+        """
+        Remux a session's live segments into VIDEO_FILE without re-encoding, then delete them.
+        Playlists left open by a crash get their end marker first, so FFmpeg reads them as
+        finished rather than waiting for more segments. Returns True if a video was written.
+        """
+        live_dir = os.path.join(session_dir, LIVE_DIR)
+        playlist = os.path.join(live_dir, LIVE_PLAYLIST_FILE)
+        if not os.path.exists(playlist):
+            return False
+        with open(playlist) as f:
+            contents = f.read()
+        if "#EXTINF" not in contents:
+            return False
+        if "#EXT-X-ENDLIST" not in contents:
+            with open(playlist, "a") as f:
+                f.write("#EXT-X-ENDLIST\n")
+
+        partial_file = os.path.join(session_dir, STREAM_PARTIAL_FILE)
+        cmd = ["ffmpeg", "-y", "-loglevel", "error", "-i", playlist, "-c", "copy",
+               "-movflags", "+faststart", "-f", "mp4", partial_file]
+        try:
+            subprocess.run(niced(cmd, self.nice_level), capture_output=True, text=True, check=True,
+                           stdin=subprocess.DEVNULL)
+        except (FileNotFoundError, subprocess.CalledProcessError) as e:
+            print(f"❌ Could not remux live segments in {session_dir}: {getattr(e, 'stderr', e)}")
+            return False
+        os.replace(partial_file, os.path.join(session_dir, VIDEO_FILE))
+        shutil.rmtree(live_dir, ignore_errors=True)
+        return True
+
+    def recover_live_session(self, session_dir):
+        """Publish the segments of a session whose recorder died mid-way"""
+        if not self.publish_live_segments(session_dir):
+            self.fail_manifest(session_dir, "No live segments could be recovered")
+            return
+        self.finalize_manifest(session_dir, 0)
+        print(f"✅ Recovered live segments: {os.path.join(session_dir, VIDEO_FILE)}")
+        self.generate_sprites(session_dir)
+
+    def recover_stream_session(self, session_dir):
+        """
+        Salvage the fragmented MP4 of a stream whose recorder died mid-way. Remuxing keeps
+        every complete fragment and fails if none were written, so only a playable video
+        is published, with its real duration.
+        """
+        partial_file = os.path.join(session_dir, STREAM_PARTIAL_FILE)
+        recovered_file = os.path.join(session_dir, STREAM_RECOVERY_FILE)
+        cmd = ["ffmpeg", "-y", "-loglevel", "error", "-i", partial_file, "-c", "copy",
+               "-movflags", "+faststart", "-f", "mp4", recovered_file]
+        try:
+            subprocess.run(niced(cmd, self.nice_level), capture_output=True, text=True, check=True,
+                           stdin=subprocess.DEVNULL)
+        except FileNotFoundError:
+            print("❌ FFmpeg not found. Leaving the interrupted stream for the next run.")
+            return
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Could not recover stream in {session_dir}: {e.stderr}")
+            duration = None
+        else:
+            duration = self.probe_duration(recovered_file)
+        if not duration:
+            if os.path.exists(recovered_file):
+                os.remove(recovered_file)
+            self.fail_manifest(session_dir, "Interrupted stream had no complete fragments")
+            return
+        os.replace(recovered_file, os.path.join(session_dir, VIDEO_FILE))
+        os.remove(partial_file)
+        self.finalize_manifest(session_dir, 0, duration=duration)
+        print(f"✅ Recovered {duration:.1f}s of interrupted stream: {os.path.join(session_dir, VIDEO_FILE)}")
+        self.generate_sprites(session_dir)
+
+    def probe_duration(self, video_file):
+        """Duration of a video in seconds according to ffprobe, or None if it can't be read"""
+        cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "json", video_file]
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True, stdin=subprocess.DEVNULL)
+            return float(json.loads(result.stdout)["format"]["duration"])
+        except (FileNotFoundError, subprocess.CalledProcessError, json.JSONDecodeError, KeyError, ValueError):
+            return None
+
+    def frame_thumbnail(self, frame):
+        """Return a small grayscale thumbnail for change detection and activity, or None if both are disabled"""
+        if self.change_threshold <= 0 and not self.activity:
+            return None
+        # Grayscale first: box-averaging one channel is about 3x cheaper on a full-size grab
+        thumbnail = frame.convert("L").resize(CHANGE_THUMBNAIL_SIZE, Image.Resampling.BOX)
+        return np.asarray(thumbnail, dtype=np.float32)
+
+    def frame_changed(self, thumbnail):
+        """Compare a thumbnail to the last kept frame; remember it and return True if it differs enough"""
+        if thumbnail is None or self.change_threshold <= 0:
+            return True
+        if self.last_thumbnail is not None:
+            difference = np.abs(thumbnail - self.last_thumbnail).mean() / 255.0
+            if difference < self.change_threshold:
+                with self.stats_lock:
+                    self.skipped_frames += 1
+                return False
+        self.last_thumbnail = thumbnail
+        return True
+
+    def forget_kept_frame(self):
+        """
+        Called when a frame that passed change detection never got written: it mustn't stay the
+        reference, or every similar frame after it would be skipped and that screen lost.
+        The next captured frame is kept instead.
+        """
+        self.last_thumbnail = None
+
+    def record_activity(self, thumbnail, captured_at):
+        """Append a captured frame's change score to the session's activity file"""
+        if thumbnail is None or self.activity_file is None:
+            return
+        if self.previous_thumbnail is None:
+            score = 0.0
+        else:
+            score = float(np.abs(thumbnail - self.previous_thumbnail).mean()) / 255.0
+        self.previous_thumbnail = thumbnail
+        self.activity_file.write(np.array([(int(captured_at), score)], dtype=ACTIVITY_DTYPE).tobytes())
+        self.activity_file.flush()
+
+    def store_frame(self, data, session_dir, captured_at):
+        """Write an encoded frame and record its capture time in the session index"""
+        frame_number = len(self.frames)
+        written = False
+        # Once the encoder has died, frames still in flight for its session have nowhere to go
+        if not self.encoder_died:
+            try:
+                self.write_frame(data, session_dir, frame_number)
+                written = True
+            except BrokenPipeError:
+                # FFmpeg exited mid-session (crash, disk full): end the session at the next tick
+                # rather than drop every frame until rotation
+                print("❌ FFmpeg stopped accepting frames; ending the session.")
+                self.encoder_died = True
+                self.session_deadline = time.monotonic()
+            except Exception as e:
+                print(f"❌ Error writing frame: {e}")
+        if not written:
+            with self.stats_lock:
+                self.dropped_frames += 1
+            self.forget_kept_frame()
+            return
+        self.index_file.write(f"{frame_number} {captured_at:.3f}\n")
+        self.index_file.flush()
+        self.frames.append(frame_number)
+        self.total_frames += 1
+        self.last_frame_at = captured_at
+        self.log_progress(len(self.frames))
+        if time.monotonic() - self.manifest_written_at >= MANIFEST_UPDATE_INTERVAL:
+            self.update_manifest(session_dir)
+
+    def sequential_loop(self, session_dir):
+        """Grab, resize, encode and write each frame on the recording thread"""
+        for _ in self.frame_ticks():
+            captured_at = time.time()
             # Capture screenshot
             frame = self.capture_screenshot()
             if frame:
-                # Save frame
-                self.save_frame(frame, session_dir, frame_number)
-                self.frames.append(frame_number)
-                frame_number += 1
-                
-                if frame_number % 30 == 0 and frame_number > 0:  # Progress update every 30 frames
-                    print(f"📸 Captured {frame_number} frames")
-            
-            # Maintain target FPS
-            elapsed = time.time() - start_time
-            sleep_time = max(0, (1.0 / self.fps) - elapsed)
-            time.sleep(sleep_time)
+                thumbnail = self.frame_thumbnail(frame)
+                self.record_activity(thumbnail, captured_at)
+                # Skip unchanged frames before paying for the encode
+                if not self.frame_changed(thumbnail):
+                    continue
+                self.store_frame(self.encode_frame(frame), session_dir, captured_at)
+
+    def enqueue_frame(self, frame_queue, item, on_drop=None):
+        """Put a captured frame on the queue, applying the backpressure policy; on_drop gets each item dropped"""
+        if self.backpressure == "block":
+            while self.recording:
+                try:
+                    frame_queue.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+            # Stopped while blocked; the frame never made it into the pipeline
+            with self.stats_lock:
+                self.dropped_frames += 1
+            if on_drop:
+                on_drop(item)
+            return
+
+        while True:
+            try:
+                frame_queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    dropped = frame_queue.get_nowait()
+                    with self.stats_lock:
+                        self.dropped_frames += 1
+                    if on_drop:
+                        on_drop(dropped)
+                except queue.Empty:
+                    pass
+
+    def pipelined_loop(self, session_dir):
+        """
+        Capture on this thread and hand frames to a pool of resize/encode workers,
+        which pass encoded frames to a single disk writer.
+        Sequence numbers are assigned here at capture, so the writer can restore capture order;
+        frames dropped by backpressure are reported to the writer so it doesn't wait for them.
+        Activity and change detection also run here, in capture order, so unchanged frames are
+        skipped before they reach the workers.
+        """
+        frame_queue = queue.Queue(maxsize=self.queue_size)
+        self.frame_queue = frame_queue
+        write_queue = queue.Queue()
+
+        def drop(item):
+            # Already counted as dropped; the writer just skips its sequence number
+            write_queue.put((item[0], None, None))
+            self.forget_kept_frame()
+
+        def encode_worker():
+            while True:
+                item = frame_queue.get()
+                if item is None:
+                    break
+                seq, captured_at, raw = item
+                try:
+                    data = self.encode_frame(self.resize_frame(raw))
+                except Exception as e:
+                    print(f"❌ Error encoding frame: {e}")
+                    data = None
+                write_queue.put((seq, captured_at, data))
+
+        def disk_writer():
+            pending = {}
+            expected_seq = 0
+            while True:
+                item = write_queue.get()
+                if item is None:
+                    break
+                pending[item[0]] = item[1:]
+                while expected_seq in pending:
+                    captured_at, data = pending.pop(expected_seq)
+                    expected_seq += 1
+                    if captured_at is None:
+                        continue
+                    if data is None:
+                        with self.stats_lock:
+                            self.dropped_frames += 1
+                        self.forget_kept_frame()
+                        continue
+                    self.store_frame(data, session_dir, captured_at)
+
+        workers = [threading.Thread(target=encode_worker, daemon=True) for _ in range(self.workers)]
+        writer = threading.Thread(target=disk_writer, daemon=True)
+        for worker in workers:
+            worker.start()
+        writer.start()
+
+        next_seq = 0
+        for _ in self.frame_ticks():
+            captured_at = time.time()
+            screenshot = self.grab_screen()
+            if screenshot is not None:
+                # A few ms on a full-size grab, against the resize and encode a skipped frame saves
+                thumbnail = self.frame_thumbnail(screenshot)
+                self.record_activity(thumbnail, captured_at)
+                if not self.frame_changed(thumbnail):
+                    continue
+                self.enqueue_frame(frame_queue, (next_seq, captured_at, screenshot), on_drop=drop)
+                next_seq += 1
+
+        # Drain: workers finish what's queued, then the writer flushes
+        for _ in workers:
+            frame_queue.put(None)
+        for worker in workers:
+            worker.join()
+        write_queue.put(None)
+        writer.join()
+        self.frame_queue = None
     
     def start_recording(self):
         """Start the recording process"""
@@ -103,36 +1374,203 @@ class ScreenRecorder:
         print(f"   📐 Resolution: {self.resolution[0]}x{self.resolution[1]}")
         print(f"   🎯 FPS: {self.fps}")
         print(f"   📂 Output: {self.output_dir}")
-        print(f"   🔄 Auto-convert: {self.auto_convert}")
+        print(f"   🎞️  Output mode: {self.output_mode}")
+        print(f"   🔍 Resize mode: {self.resize_mode}")
+        for display in getattr(self.frame_source, "layout", None) or []:
+            rate = self.fps / display["every_n_frames"]
+            print(f"   🖥️  {display['name']}: {display['width']}x{display['height']} at {rate:g} fps")
+        if self.rotate_interval:
+            print(f"   🔁 New session every {self.rotate_interval / 3600:g} hours")
+        if self.output_mode == "frames":
+            print(f"   🔄 Auto-convert: {self.auto_convert}")
+        if self.change_threshold > 0:
+            print(f"   🔍 Change threshold: {self.change_threshold}")
+        if self.pipeline:
+            print(f"   🧵 Pipeline: {self.workers} workers, queue {self.queue_size}, {self.backpressure}")
         print("   Press Ctrl+C to stop")
         
         self.recording = True
         self.frames = []
+        self.total_frames = 0
+        self.stop_event.clear()
+        self.dropped_frames = 0
+        self.late_frames = 0
+        self.skipped_frames = 0
         
         # Start recording in separate thread
         self.recording_thread = threading.Thread(target=self.recording_loop)
         self.recording_thread.daemon = True
         self.recording_thread.start()
+        if self.metrics_file:
+            print(f"   📈 Metrics: {self.metrics_file}")
+            threading.Thread(target=self.metrics_loop, daemon=True).start()
+        if self.compactor:
+            self.compactor.start(self)
     
     def stop_recording(self):
-        """Stop recording and optionally convert to video"""
+        """Stop recording and wait for background conversions to finish"""
         if not self.recording:
             return
         
         self.recording = False
+        self.stop_event.set()
         
         # Wait for recording thread to finish
         if hasattr(self, 'recording_thread'):
             self.recording_thread.join()
         
-        print(f"✅ Recording stopped. Captured {len(self.frames)} frames.")
+        print(f"✅ Recording stopped. Captured {self.total_frames} frames.")
+        if self.dropped_frames or self.late_frames:
+            print(f"⚠️  Dropped {self.dropped_frames} frames, {self.late_frames} late frames.")
+        if self.skipped_frames:
+            print(f"💤 Skipped {self.skipped_frames} unchanged frames.")
+        if self.total_frames:
+            print(f"⏱️  Stage timings p50/p95 (last {STAGE_TIMING_WINDOW} frames): {self.timers.summary()}")
         
-        if self.auto_convert and len(self.frames) > 0 and self.current_session:
-            self.convert_to_video(self.current_session)
+        # The last session was queued by the recording thread; let queued work finish
+        if self.converter.pending():
+            print(f"⏳ Waiting for {self.converter.pending()} queued conversion(s)...")
+        self.converter.join()
+        if self.metrics_file:
+            self.write_metrics()
+
+    def metrics_text(self):
+        """Render the recorder's counters, gauges and histograms in the Prometheus text format"""
+        with self.stats_lock:
+            dropped, late, skipped = self.dropped_frames, self.late_frames, self.skipped_frames
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+
+        metric("recorder_recording", "gauge", "1 while the recorder is capturing",
+               [f"recorder_recording {int(self.recording)}"])
+        metric("recorder_frames_captured_total", "counter", "Frames written to a session",
+               [f"recorder_frames_captured_total {self.total_frames}"])
+        metric("recorder_frames_dropped_total", "counter", "Frames lost to backpressure or write errors",
+               [f"recorder_frames_dropped_total {dropped}"])
+        metric("recorder_frames_late_total", "counter", "Frame ticks missed because the loop fell behind",
+               [f"recorder_frames_late_total {late}"])
+        metric("recorder_frames_skipped_total", "counter", "Frames skipped as unchanged",
+               [f"recorder_frames_skipped_total {skipped}"])
+        metric("recorder_last_frame_timestamp_seconds", "gauge", "Unix time of the last written frame",
+               [f"recorder_last_frame_timestamp_seconds {self.last_frame_at:.3f}"])
+        metric("recorder_bytes_written_total", "counter", "Encoded frame bytes written to disk or the encoder",
+               [f"recorder_bytes_written_total {self.bytes_written}"])
+        metric("recorder_capture_jitter_seconds", "histogram", "Delay between a frame's scheduled tick and its capture",
+               self.tick_jitter.render("recorder_capture_jitter_seconds"))
+        stage_lines = []
+        for stage, histogram in self.timers.histograms.items():
+            stage_lines.extend(histogram.render("recorder_stage_duration_seconds", f'stage="{stage}"'))
+        metric("recorder_stage_duration_seconds", "histogram", "Per-frame time spent in each capture stage",
+               stage_lines)
+        frame_queue = self.frame_queue
+        metric("recorder_queue_depth", "gauge", "Items waiting in the capture and conversion queues",
+               [f'recorder_queue_depth{{queue="capture"}} {frame_queue.qsize() if frame_queue else 0}',
+                f'recorder_queue_depth{{queue="conversion"}} {self.converter.pending()}'])
+        metric("recorder_conversion_duration_seconds", "histogram", "Time to convert or finalize a session video",
+               self.conversion_seconds.render("recorder_conversion_duration_seconds"))
+        metric("recorder_conversion_failures_total", "counter", "Session videos that failed to convert",
+               [f"recorder_conversion_failures_total {self.conversion_failures}"])
+        return "\n".join(lines) + "\n"
+
+    def write_metrics(self):
+        """Atomically replace the metrics file so scrapers never read a partial write"""
+        temp_path = self.metrics_file + ".tmp"
+        try:
+            with open(temp_path, "w") as f:
+                f.write(self.metrics_text())
+            os.replace(temp_path, self.metrics_file)
+        except OSError as e:
+            print(f"⚠️  Could not write metrics file: {e}")
+
+    def metrics_loop(self):
+        """Rewrite the metrics file every METRICS_INTERVAL seconds until recording stops"""
+        self.write_metrics()
+        while not self.stop_event.wait(METRICS_INTERVAL):
+            self.write_metrics()
     
+    def read_timestamp_index(self, session_dir):
+        """Read (frame_number, timestamp) pairs from a session's index"""
+        index_path = os.path.join(session_dir, TIMESTAMP_INDEX_FILE)
+        if not os.path.exists(index_path):
+            return []
+        entries = []
+        with open(index_path) as f:
+            for line in f:
+                try:
+                    frame_number, timestamp = line.split()
+                    entries.append((int(frame_number), float(timestamp)))
+                except ValueError:
+                    continue  # Partially written last line after a crash
+        return entries
+
+    def write_concat_list(self, session_dir, entries):
+        """Write an FFmpeg concat list that shows each frame until the next one was captured"""
+        concat_path = os.path.join(session_dir, CONCAT_LIST_FILE)
+        with open(concat_path, "w") as f:
+            f.write("ffconcat version 1.0\n")
+            for (frame_number, timestamp), (_, next_timestamp) in zip(entries, entries[1:]):
+                f.write(f"file 'frame_{frame_number:06d}.jpg'\n")
+                f.write(f"duration {max(next_timestamp - timestamp, 0.001):.3f}\n")
+            last_file = f"frame_{entries[-1][0]:06d}.jpg"
+            f.write(f"file '{last_file}'\n")
+            f.write(f"duration {1.0 / self.fps:.3f}\n")
+            # The concat demuxer ignores the final entry's duration unless the file is repeated
+            f.write(f"file '{last_file}'\n")
+        return concat_path
+
+    def conversion_commands(self, session_dir, output_file, profile_name):
+        """
+        Build the FFmpeg commands that encode a session's frames into output_file with a profile.
+        Returns (commands, temporary files to remove afterwards).
+        Sessions with a timestamp index are encoded at variable frame rate, so skipped
+        and dropped frames keep their real timing.
+        """
+        profile = ENCODER_PROFILES[profile_name]
+        palette_file = os.path.join(session_dir, "palette.png")
+        concat_file = os.path.join(session_dir, CONCAT_LIST_FILE)
+
+        index_entries = [(n, ts) for n, ts in self.read_timestamp_index(session_dir)
+                         if os.path.exists(os.path.join(session_dir, f"frame_{n:06d}.jpg"))]
+        if index_entries:
+            self.write_concat_list(session_dir, index_entries)
+            input_args = ["-f", "concat", "-safe", "0", "-i", concat_file]
+            timing_args = ["-fps_mode", "vfr"]
+        else:
+            # Legacy session without an index: assume a constant frame rate
+            input_args = ["-framerate", str(self.fps), "-i", os.path.join(session_dir, "frame_%06d.jpg")]
+            timing_args = []
+
+        commands = []
+        if profile["palette"]:
+            # Pass 1: generate a colour palette from the frames
+            commands.append([
+                "ffmpeg", "-y",
+                *input_args,
+                "-vf", "palettegen=stats_mode=single",
+                palette_file
+            ])
+            palette_args = ["-i", palette_file,
+                            "-lavfi", "paletteuse=dither=bayer:bayer_scale=5:diff_mode=rectangle"]
+        else:
+            palette_args = []
+        commands.append([
+            "ffmpeg", "-y",
+            *input_args,
+            *palette_args,
+            *profile["video_args"],
+            *timing_args,
+            output_file
+        ])
+        return commands, [palette_file, concat_file]
+
     def convert_to_video(self, session_dir):
         """
-        Convert frames to a highly compressed MP4 video using a two-pass FFmpeg process.
+        Convert frames to a highly compressed MP4 video with the selected encoder profile.
+        The default "palette" profile is a two-pass FFmpeg process:
         1. Generate a 256-color palette from the frames.
         2. Use the palette to create a smaller video file.
         """
@@ -145,84 +1583,82 @@ class ScreenRecorder:
             print(f"ℹ️ No frames found in {session_dir} to convert.")
             return
         
-        print(f"🎞️  Converting frames to video for session: {session_dir}...")
+        profile_name = self.profile_for("frames")
+        print(f"🎞️  Converting frames to video for session: {session_dir} (profile: {profile_name})...")
+        started = time.monotonic()
+        if self.read_manifest(session_dir) is None:
+            # Recovered legacy session; capture what we know before the frames are cleaned up
+            self.write_manifest(session_dir, self.legacy_manifest(session_dir))
         
-        input_pattern = os.path.join(session_dir, "frame_%06d.jpg")
-        palette_file = os.path.join(session_dir, "palette.png")
-        output_file = os.path.join(session_dir, "recording.mp4")
+        output_file = os.path.join(session_dir, VIDEO_FILE)
+        commands, temp_files = self.conversion_commands(session_dir, output_file, profile_name)
         
         try:
-            # --- Pass 1: Generate color palette ---
-            print("   -> Step 1/2: Generating color palette...")
-            cmd_palette = [
-                "ffmpeg", "-y",
-                "-framerate", str(self.fps),
-                "-i", input_pattern,
-                "-vf", "palettegen=stats_mode=single",
-                palette_file
-            ]
-            import subprocess
-            subprocess.run(cmd_palette, capture_output=True, text=True, check=True)
+            steps = ["Generating color palette", "Encoding video"][-len(commands):]
+            for step, (cmd, label) in enumerate(zip(commands, steps), 1):
+                print(f"   -> Step {step}/{len(commands)}: {label}...")
+                subprocess.run(niced(cmd, self.nice_level), capture_output=True, text=True, check=True,
+                               stdin=subprocess.DEVNULL)
 
-            # --- Pass 2: Create video using the palette ---
-            print("   -> Step 2/2: Encoding video...")
-            cmd_video = [
-                "ffmpeg", "-y",
-                "-framerate", str(self.fps),
-                "-i", input_pattern,
-                "-i", palette_file,
-                "-lavfi", "paletteuse=dither=bayer:bayer_scale=5:diff_mode=rectangle",
-                "-c:v", "libx264",
-                "-preset", "medium",       # Slower preset for better compression
-                "-tune", "stillimage",    # Optimized for static content like screen text
-                "-crf", "30",             # Higher CRF for more compression (lower quality)
-                "-pix_fmt", "yuv420p",      # Compatibility
-                output_file
-            ]
-            result_video = subprocess.run(cmd_video, capture_output=True, text=True)
-
-            if result_video.returncode == 0:
-                print(f"✅ Video saved: {output_file}")
-                video_size = os.path.getsize(output_file) / (1024 * 1024)
-                print(f"📊 Video size: {video_size:.1f} MB")
-                
-                # Clean up frames automatically
-                self.cleanup_frames(session_dir)
-            else:
-                print(f"❌ FFmpeg error during video encoding: {result_video.stderr}")
+            self.conversion_seconds.observe(time.monotonic() - started)
+            self.finalize_manifest(session_dir, time.monotonic() - started, encoder_profile=profile_name)
+            print(f"✅ Video saved: {output_file}")
+            video_size = os.path.getsize(output_file) / (1024 * 1024)
+            print(f"📊 Video size: {video_size:.1f} MB")
+            
+            # Clean up frames automatically
+            self.cleanup_frames(session_dir)
+            self.generate_sprites(session_dir)
 
+        # The frames are kept, so the next start retries the conversion
         except FileNotFoundError:
             print("❌ FFmpeg not found. Please install FFmpeg to convert to video.")
             print("   Install with: brew install ffmpeg")
+            self.conversion_failures += 1
+            self.fail_manifest(session_dir, "FFmpeg not found")
         except subprocess.CalledProcessError as e:
-            print(f"❌ FFmpeg error during palette generation: {e.stderr}")
+            print(f"❌ FFmpeg error during conversion: {e.stderr}")
+            self.conversion_failures += 1
+            self.fail_manifest(session_dir, f"FFmpeg exited with code {e.returncode}")
         except Exception as e:
             print(f"❌ Error during conversion: {e}")
+            self.conversion_failures += 1
+            self.fail_manifest(session_dir, str(e))
         finally:
             # --- Cleanup ---
-            if os.path.exists(palette_file):
-                os.remove(palette_file)
-                print(f"🗑️  Cleaned up temporary palette file.")
+            for temp_file in temp_files:
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
     
     def recover_incomplete_sessions(self):
-        """Scan output directory for incomplete sessions and try to convert them."""
+        """Scan output directory for incomplete sessions and queue them for conversion."""
         print(f"🔎 Checking for incomplete sessions in {self.output_dir}...")
         for session_name in os.listdir(self.output_dir):
             session_path = os.path.join(self.output_dir, session_name)
             if os.path.isdir(session_path):
                 has_frames = any(f.startswith('frame_') and f.endswith('.jpg') for f in os.listdir(session_path))
-                has_video = os.path.exists(os.path.join(session_path, 'recording.mp4'))
-                
-                if has_frames and not has_video:
-                    print(f"🛠️ Found incomplete session: {session_name}. Attempting conversion.")
-                    self.convert_to_video(session_path)
+                has_video = os.path.exists(os.path.join(session_path, VIDEO_FILE))
+                partial_file = os.path.join(session_path, STREAM_PARTIAL_FILE)
+                live_playlist = os.path.join(session_path, LIVE_DIR, LIVE_PLAYLIST_FILE)
+
+                if os.path.exists(live_playlist) and not has_video:
+                    # Every completed segment survived; at most the last one is lost
+                    print(f"🛠️ Found interrupted live session: {session_name}. Queued for remux.")
+                    self.submit_session_job(session_path, self.recover_live_session, session_path)
+                elif os.path.exists(partial_file) and not has_video:
+                    # Fragmented MP4 is playable up to the last complete fragment
+                    print(f"🛠️ Found interrupted stream: {session_name}. Queued for remux.")
+                    self.submit_session_job(session_path, self.recover_stream_session, session_path)
+                elif has_frames and not has_video:
+                    print(f"🛠️ Found incomplete session: {session_name}. Queued for conversion.")
+                    self.submit_session_job(session_path, self.convert_to_video, session_path)
                 elif has_frames and has_video:
                     print(f"ℹ️ Session {session_name} already has a video. Checking if frames need cleanup.")
                     # If video exists but frames are still there, it implies cleanup might have failed or was skipped.
                     # We can offer to clean them up here, or just proceed with the new logic which cleans up after conversion.
                     # For now, let's assume convert_to_video will handle cleanup if it runs again.
                     # Or, more directly, we can call cleanup if video exists and frames exist.
-                    self.cleanup_frames(session_path) # Ensure cleanup if video exists and frames are present
+                    self.submit_session_job(session_path, self.cleanup_frames, session_path) # Ensure cleanup if video exists and frames are present
 
         print("✅ Finished checking for incomplete sessions.")
 
@@ -241,6 +1677,297 @@ class ScreenRecorder:
         except Exception as e:
             print(f"❌ Error cleaning up frames in {session_dir}: {e}")
 
+class Compactor:
+    """
+    Keeps old recordings small and the recordings folder under a disk budget.
+    - Sessions older than after_days are re-encoded at a lower resolution, frame rate and
+      bitrate, then each day's sessions are merged into one video by stream copy. The merged
+      session's manifest lists the original sessions as "parts" with their video offsets.
+    - If the folder is over budget_bytes, the oldest days are evicted: their videos are
+      deleted but manifests, sprite sheets and activity scores are kept, so the viewer can
+      still show them.
+    Every step is recorded in the manifests or done through a staging folder, so a run that
+    is interrupted picks up where it left off. FFmpeg runs at low priority, `concurrency`
+    sessions at a time.
+    """
+    def __init__(self, output_dir, after_days=None, resolution=COMPACT_RESOLUTION, fps=COMPACT_FPS,
+                 profile=COMPACT_PROFILE, budget_bytes=None, concurrency=1, nice_level=10):
+        self.output_dir = output_dir
+        self.after_days = after_days
+        self.resolution = resolution
+        self.fps = fps
+        self.profile = profile
+        self.budget_bytes = budget_bytes
+        self.concurrency = max(1, concurrency)
+        self.nice_level = nice_level
+        self.lock = threading.Lock()
+
+    def start(self, recorder):
+        """Run in the background unless a run is already going"""
+        if not self.lock.acquire(blocking=False):
+            return
+        def run():
+            try:
+                self.run(recorder)
+            except Exception as e:
+                print(f"❌ Error during compaction: {e}")
+            finally:
+                self.lock.release()
+        threading.Thread(target=run, daemon=True).start()
+
+    def run(self, recorder):
+        """One full pass: finish interrupted merges, compact old days, then enforce the budget"""
+        self.resume(recorder)
+        if self.after_days:
+            cutoff = (datetime.now() - timedelta(days=self.after_days)).strftime("%Y%m%d")
+            for day, sessions in sorted(self.sessions_by_day(recorder).items()):
+                if day < cutoff and not self.day_is_busy(recorder, sessions):
+                    self.compact_day(recorder, day, sessions)
+        if self.budget_bytes:
+            self.enforce_budget(recorder)
+
+    def sessions_by_day(self, recorder):
+        """{YYYYMMDD: [(session_dir, manifest), ...]} for every session folder; legacy ones get a built manifest"""
+        days = collections.defaultdict(list)
+        for name in sorted(os.listdir(self.output_dir)):
+            session_dir = os.path.join(self.output_dir, name)
+            try:
+                datetime.strptime(name, SESSION_NAME_FORMAT)
+            except ValueError:
+                continue
+            if not os.path.isdir(session_dir):
+                continue
+            manifest = recorder.read_manifest(session_dir) or recorder.legacy_manifest(session_dir)
+            days[name[:8]].append((session_dir, manifest))
+        return days
+
+    def day_is_busy(self, recorder, sessions):
+        """True while any session of the day is still being recorded or finished"""
+        for session_dir, manifest in sessions:
+            if recorder.session_is_active(session_dir):
+                return True
+            if manifest.get("status") in ("recording", "encoding", "converting"):
+                # Possibly another process at work; trust the status only while it's fresh
+                try:
+                    age = time.time() - os.path.getmtime(os.path.join(session_dir, MANIFEST_FILE))
+                except OSError:
+                    continue
+                if age < COMPACT_STALE_SECONDS:
+                    return True
+        return False
+
+    def resume(self, recorder):
+        """Finish merges whose staging folder is complete; discard half-built ones and leftover trash"""
+        for name in sorted(os.listdir(self.output_dir)):
+            path = os.path.join(self.output_dir, name)
+            if name.startswith(COMPACT_STAGING_PREFIX):
+                manifest = recorder.read_manifest(path)
+                if manifest and manifest.get("status") == "complete":
+                    print(f"🛠️ Finishing interrupted merge of {name[len(COMPACT_STAGING_PREFIX):]}")
+                    self.commit_merge(recorder, path, manifest)
+                else:
+                    shutil.rmtree(path, ignore_errors=True)
+        for name in os.listdir(self.output_dir):
+            if name.startswith(COMPACT_TRASH_PREFIX):
+                shutil.rmtree(os.path.join(self.output_dir, name), ignore_errors=True)
+
+    def compact_day(self, recorder, day, sessions):
+        # Only sessions with a finished video; recorded-only, failed and evicted ones stay as they are
+        sessions = [(d, m) for d, m in sessions if m.get("status") == "complete"]
+        if not sessions:
+            return
+        pending = [(d, m) for d, m in sessions if not m.get("compaction")]
+        if pending:
+            print(f"🗜️  Compacting {len(pending)} session(s) from {day}...")
+            jobs = ConversionQueue(self.concurrency)
+            for session_dir, manifest in pending:
+                jobs.submit(self.compact_session, recorder, session_dir, manifest)
+            jobs.join()
+        sessions = [(d, recorder.read_manifest(d)) for d, _ in sessions]
+        if len(sessions) > 1 and all(m and m.get("compaction") for _, m in sessions):
+            if self.merge_day(recorder, day, sessions):
+                return
+        # Not merged: the re-encoded sessions need sprites matching their new videos
+        for session_dir, _ in pending:
+            recorder.generate_sprites(session_dir)
+
+    def compaction_settings(self):
+        width, height = self.resolution
+        return {"width": width, "height": height, "fps": self.fps, "profile": self.profile}
+
+    def compact_session(self, recorder, session_dir, manifest):
+        """Re-encode one session's video smaller, in place"""
+        video_file = os.path.join(session_dir, VIDEO_FILE)
+        partial_file = os.path.join(session_dir, STREAM_PARTIAL_FILE)
+        width, height = self.resolution
+        cmd = [
+            "ffmpeg", "-y",
+            "-loglevel", "error",
+            "-i", video_file,
+            # Same size and rate for every session, so a day can be merged without re-encoding
+            "-vf", (f"fps={self.fps},"
+                    f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                    f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2"),
+            *ENCODER_PROFILES[self.profile]["video_args"],
+            "-movflags", "+faststart",
+            "-f", "mp4",
+            partial_file
+        ]
+        started = time.monotonic()
+        try:
+            subprocess.run(niced(cmd, self.nice_level), capture_output=True, text=True, check=True,
+                           stdin=subprocess.DEVNULL)
+        except FileNotFoundError:
+            print("❌ FFmpeg not found. Skipping compaction.")
+            return
+        except subprocess.CalledProcessError as e:
+            print(f"❌ FFmpeg error compacting {session_dir}: {e.stderr}")
+            return
+        before = manifest.get("video_size") or os.path.getsize(video_file)
+        os.replace(partial_file, video_file)
+        # Timing fields (fps, frame_count, variable_frame_rate) keep describing the capture,
+        # so the timestamp index still maps capture times to video offsets
+        manifest.update(video_size=os.path.getsize(video_file), width=width, height=height,
+                        compaction=dict(self.compaction_settings(), original_size=before,
+                                        encode_seconds=round(time.monotonic() - started, 3)))
+        recorder.write_manifest(session_dir, manifest)
+        print(f"✅ Compacted {os.path.basename(session_dir)}: {before / 1048576:.1f} MB -> "
+              f"{manifest['video_size'] / 1048576:.1f} MB")
+
+    def merge_day(self, recorder, day, sessions):
+        """Concatenate a day's compacted sessions by stream copy into one session folder; returns True if merged"""
+        staging = os.path.join(self.output_dir, COMPACT_STAGING_PREFIX + day)
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        concat_file = os.path.join(staging, CONCAT_LIST_FILE)
+        with open(concat_file, "w") as f:
+            f.write("ffconcat version 1.0\n")
+            for session_dir, _ in sessions:
+                f.write(f"file '{os.path.abspath(os.path.join(session_dir, VIDEO_FILE))}'\n")
+        cmd = ["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", concat_file,
+               "-c", "copy", "-movflags", "+faststart", os.path.join(staging, VIDEO_FILE)]
+        try:
+            subprocess.run(niced(cmd, self.nice_level), capture_output=True, text=True, check=True,
+                           stdin=subprocess.DEVNULL)
+        except (FileNotFoundError, subprocess.CalledProcessError) as e:
+            # Leave the sessions compacted but separate; the viewer handles both
+            print(f"⚠️  Could not merge {day} by stream copy, keeping separate sessions: {getattr(e, 'stderr', e)}")
+            shutil.rmtree(staging, ignore_errors=True)
+            return False
+        os.remove(concat_file)
+        # Activity records carry absolute timestamps, so the day's files simply concatenate
+        with open(os.path.join(staging, ACTIVITY_FILE), "wb") as merged_activity:
+            for session_dir, _ in sessions:
+                try:
+                    with open(os.path.join(session_dir, ACTIVITY_FILE), "rb") as f:
+                        shutil.copyfileobj(f, merged_activity)
+                except OSError:
+                    pass
+
+        manifests = [m for _, m in sessions]
+        parts, offset = [], 0.0
+        for session_dir, manifest in sessions:
+            duration = manifest.get("duration") or 0
+            parts.append({"session": os.path.basename(session_dir), "start_timestamp": manifest.get("start_timestamp"),
+                          "duration": duration, "offset": round(offset, 3)})
+            offset += duration
+        merged = dict(manifests[0])
+        if any(m.get("displays") != merged.get("displays") for m in manifests):
+            merged["displays"] = None
+        merged.update(
+            ended_at=manifests[-1].get("ended_at"),
+            end_timestamp=manifests[-1].get("end_timestamp"),
+            frame_count=sum(m.get("frame_count") or 0 for m in manifests),
+            dropped_frames=sum(m.get("dropped_frames") or 0 for m in manifests),
+            late_frames=sum(m.get("late_frames") or 0 for m in manifests),
+            skipped_frames=sum(m.get("skipped_frames") or 0 for m in manifests),
+            duration=round(offset, 3),
+            video_size=os.path.getsize(os.path.join(staging, VIDEO_FILE)),
+            parts=parts,
+            compaction=dict(self.compaction_settings(),
+                            original_size=sum(m["compaction"].get("original_size") or 0 for m in manifests)),
+        )
+        # Written last: a staging folder with a complete manifest is ready to commit
+        recorder.write_manifest(staging, merged)
+        self.commit_merge(recorder, staging, merged)
+        return True
+
+    def commit_merge(self, recorder, staging, manifest):
+        """Swap a finished staging folder in for the sessions it merged; safe to repeat"""
+        for part in manifest["parts"]:
+            source = os.path.join(self.output_dir, part["session"])
+            if os.path.isdir(source):
+                os.replace(source, os.path.join(self.output_dir, COMPACT_TRASH_PREFIX + part["session"]))
+        final_dir = os.path.join(self.output_dir, manifest["parts"][0]["session"])
+        os.replace(staging, final_dir)
+        for part in manifest["parts"]:
+            shutil.rmtree(os.path.join(self.output_dir, COMPACT_TRASH_PREFIX + part["session"]), ignore_errors=True)
+        print(f"✅ Merged {len(manifest['parts'])} sessions into {final_dir}")
+        recorder.generate_sprites(final_dir)
+
+    def folder_size(self):
+        total = 0
+        for root, dirs, files in os.walk(self.output_dir):
+            if root == self.output_dir and EXPORT_CACHE_DIR in dirs:
+                dirs.remove(EXPORT_CACHE_DIR)
+            for name in files:
+                try:
+                    total += os.lstat(os.path.join(root, name)).st_size
+                except OSError:
+                    pass
+        return total
+
+    def enforce_budget(self, recorder):
+        """Evict whole days, oldest first, until the folder fits the budget"""
+        total = self.folder_size()
+        if total <= self.budget_bytes:
+            return
+        today = datetime.now().strftime("%Y%m%d")
+        for day, sessions in sorted(self.sessions_by_day(recorder).items()):
+            if total <= self.budget_bytes:
+                break
+            if day >= today or self.day_is_busy(recorder, sessions):
+                continue
+            for session_dir, manifest in sessions:
+                if manifest.get("status") == "evicted":
+                    continue
+                total -= self.evict_session(recorder, session_dir, manifest)
+            self.drop_exports(day)
+            print(f"🧹 Evicted recordings from {day} to stay under the disk budget")
+
+    def drop_exports(self, day):
+        """Delete the viewer's cached exports of a day (YYYYMMDD)"""
+        export_dir = os.path.join(self.output_dir, EXPORT_CACHE_DIR)
+        prefix = datetime.strptime(day, "%Y%m%d").strftime("%Y-%m-%d_")
+        try:
+            names = os.listdir(export_dir)
+        except OSError:
+            return
+        for name in names:
+            if name.startswith(prefix) and name.endswith(".mp4"):
+                try:
+                    os.remove(os.path.join(export_dir, name))
+                except OSError:
+                    pass
+
+    def evict_session(self, recorder, session_dir, manifest):
+        """Delete everything but the manifest, sprite sheets and activity scores; returns the bytes freed"""
+        freed = 0
+        for name in os.listdir(session_dir):
+            if name in (MANIFEST_FILE, SPRITE_DIR, ACTIVITY_FILE):
+                continue
+            path = os.path.join(session_dir, name)
+            if os.path.isdir(path):
+                freed += sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                freed += os.path.getsize(path)
+                os.remove(path)
+        manifest.update(status="evicted", video_file=None,
+                        evicted_at=datetime.now().astimezone().isoformat(timespec="seconds"))
+        recorder.write_manifest(session_dir, manifest)
+        return freed
+
 def main():
     parser = argparse.ArgumentParser(description="Lightweight Auto Screen Recorder")
     parser.add_argument("--fps", type=float, default=1, help="Frames per second (default: 1)")
@@ -248,30 +1975,129 @@ def main():
     parser.add_argument("--height", type=int, default=720, help="Video height (default: 720)")
     parser.add_argument("--output", type=str, default="recordings", help="Output directory")
     parser.add_argument("--no-convert", action="store_true", help="Skip video conversion")
+    parser.add_argument("--output-mode", choices=OUTPUT_MODES, default="stream",
+                        help="stream: pipe frames into FFmpeg as they are captured; "
+                             f"hls: the same, written as {LIVE_SEGMENT_SECONDS}s live segments the viewer can play "
+                             "while recording; frames: save JPEGs and convert when the session ends (default: stream)")
+    parser.add_argument("--change-threshold", type=float, default=0.0,
+                        help="Skip frames whose mean difference from the last kept frame is below this "
+                             "fraction, e.g. 0.002 (default: 0, keep every frame)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Capture on one thread and resize/encode/write on a worker pool")
+    parser.add_argument("--workers", type=int, default=2, help="Resize/encode workers in pipeline mode (default: 2)")
+    parser.add_argument("--queue-size", type=int, default=8, help="Max frames waiting for a worker (default: 8)")
+    parser.add_argument("--backpressure", choices=BACKPRESSURE_POLICIES, default="drop-oldest",
+                        help="What to do when the queue is full (default: drop-oldest)")
+    parser.add_argument("--rotate-hours", type=float, default=4,
+                        help="Start a new session every N hours without stopping capture (default: 4, 0 disables)")
+    parser.add_argument("--convert-workers", type=int, default=1,
+                        help="Sessions converted concurrently in the background (default: 1)")
+    parser.add_argument("--nice", type=int, default=10,
+                        help="Niceness added to background FFmpeg conversions (default: 10)")
+    parser.add_argument("--no-sprites", action="store_true", help="Skip scrubbing thumbnail generation")
+    parser.add_argument("--encoder-profile", choices=sorted(ENCODER_PROFILES),
+                        help="Encoder settings: " + "; ".join(f"{name}: {profile['description']}"
+                                                              for name, profile in ENCODER_PROFILES.items())
+                             + " (default: fast when streaming, palette for frames)")
+    parser.add_argument("--resize-mode", choices=RESIZE_MODES, default="quality",
+                        help="Downscaling: quality (Lanczos) or fast (integer reduce + bilinear) (default: quality)")
+    parser.add_argument("--timings", action="store_true",
+                        help="Print rolling per-stage timings (grab/resize/convert/encode/write) with progress")
+    parser.add_argument("--source", choices=FRAME_SOURCES, default="screen",
+                        help="Frame source: the real screen, or synthetic static/motion frames for headless runs")
+    parser.add_argument("--source-width", type=int, default=2560, help="Synthetic frame width (default: 2560)")
+    parser.add_argument("--source-height", type=int, default=1440, help="Synthetic frame height (default: 1440)")
+    parser.add_argument("--displays", default="primary",
+                        help="Displays to record: primary, all, or display numbers like 0,2; several displays "
+                             "are captured in parallel and tiled side by side (default: primary)")
+    parser.add_argument("--display-size", default=None,
+                        help="Max tile size per display as WxH, one for all or comma-separated per display "
+                             "(default: --width x --height)")
+    parser.add_argument("--display-fps", default=None,
+                        help="Capture rate per display, one for all or comma-separated, at most --fps; slower "
+                             "displays repeat their last image in between (default: --fps)")
+    parser.add_argument("--no-activity", action="store_true", help="Don't record per-frame activity scores")
+    parser.add_argument("--metrics-file", type=str,
+                        help=f"Write Prometheus metrics to this file every {METRICS_INTERVAL}s (textfile collector format)")
+    parser.add_argument("--compact-after-days", type=float, default=0,
+                        help="Re-encode sessions older than N days smaller and merge each day into one video (default: off)")
+    parser.add_argument("--compact-width", type=int, default=COMPACT_RESOLUTION[0],
+                        help=f"Width of compacted videos (default: {COMPACT_RESOLUTION[0]})")
+    parser.add_argument("--compact-height", type=int, default=COMPACT_RESOLUTION[1],
+                        help=f"Height of compacted videos (default: {COMPACT_RESOLUTION[1]})")
+    parser.add_argument("--compact-fps", type=float, default=COMPACT_FPS,
+                        help=f"Frame rate of compacted videos (default: {COMPACT_FPS})")
+    parser.add_argument("--compact-profile", choices=sorted(ENCODER_PROFILES), default=COMPACT_PROFILE,
+                        help=f"Encoder profile for compacted videos (default: {COMPACT_PROFILE})")
+    parser.add_argument("--compact-workers", type=int, default=1, help="Sessions re-encoded concurrently (default: 1)")
+    parser.add_argument("--disk-budget-gb", type=float, default=0,
+                        help="Evict the oldest days' videos (keeping manifests and thumbnails) beyond this size (default: off)")
+    parser.add_argument("--compact-only", action="store_true",
+                        help="Run one compaction/eviction pass over the output directory and exit")
     
     args = parser.parse_args()
+
+    try:
+        displays = args.displays if args.displays in ("primary", "all") else [int(n) for n in args.displays.split(",")]
+        tile_sizes = [tuple(int(v) for v in size.split("x")) for size in args.display_size.split(",")] \
+            if args.display_size else [(args.width, args.height)]
+        display_fps = [float(rate) for rate in args.display_fps.split(",")] if args.display_fps else None
+        frame_source = make_frame_source(args.source, (args.source_width, args.source_height), displays,
+                                         tile_sizes, display_fps, args.fps, args.resize_mode)
+    except ValueError as e:
+        parser.error(str(e))
+
+    compactor = None
+    if args.compact_after_days > 0 or args.disk_budget_gb > 0:
+        compactor = Compactor(
+            args.output,
+            after_days=args.compact_after_days or None,
+            resolution=(args.compact_width, args.compact_height),
+            fps=args.compact_fps,
+            profile=args.compact_profile,
+            budget_bytes=int(args.disk_budget_gb * 1024 ** 3) or None,
+            concurrency=args.compact_workers,
+            nice_level=args.nice,
+        )
     
     # Create recorder instance
     recorder = ScreenRecorder(
         fps=args.fps,
         resolution=(args.width, args.height),
         output_dir=args.output,
-        auto_convert=not args.no_convert
+        auto_convert=not args.no_convert,
+        pipeline=args.pipeline,
+        workers=args.workers,
+        queue_size=args.queue_size,
+        backpressure=args.backpressure,
+        output_mode=args.output_mode,
+        change_threshold=args.change_threshold,
+        rotate_interval=args.rotate_hours * 3600 if args.rotate_hours > 0 else None,
+        convert_workers=args.convert_workers,
+        nice_level=args.nice,
+        sprites=not args.no_sprites,
+        encoder_profile=args.encoder_profile,
+        resize_mode=args.resize_mode,
+        show_timings=args.timings,
+        metrics_file=args.metrics_file,
+        frame_source=frame_source,
+        compactor=None if args.compact_only else compactor,
+        activity=not args.no_activity
     )
+
+    if args.compact_only:
+        if compactor:
+            compactor.run(recorder)
+        else:
+            print("ℹ️ Nothing to do: pass --compact-after-days and/or --disk-budget-gb.")
+        recorder.converter.join()
+        return
     
     try:
-        # Start recording
+        # Start recording; sessions rotate in-process, so just keep the main thread alive
         recorder.start_recording()
 
-        # Keep main thread alive, but exit after 4 hours
-        start_time = time.time()
-        four_hours = 4 * 60 * 60  # 14400 seconds
-
         while recorder.recording:
-            if time.time() - start_time > four_hours:
-                print("⏳ 4-hour limit reached. Shutting down to restart.")
-                recorder.stop_recording()
-                break  # Exit the loop, allowing the script to terminate
             time.sleep(1)
 
     except KeyboardInterrupt:
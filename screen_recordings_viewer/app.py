@@ -1,10 +1,20 @@
 import os
 import re
+import struct
 import subprocess
 import json
-from flask import Flask, render_template, send_from_directory, url_for, abort
-from datetime import datetime, timedelta
-from collections import defaultdict
+import threading
+import uuid
+import bisect
+import time
+import argparse
+import hashlib
+import tempfile
+from flask import (Flask, Response, request, jsonify, render_template, send_from_directory, send_file, url_for, abort, g,
+                   stream_with_context)
+from datetime import datetime, timedelta, timezone
+from collections import defaultdict, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
 
 app = Flask(__name__)
 
@@ -15,14 +25,131 @@ RECORDINGS_DIR_RELATIVE_TO_APP = os.path.join('..', 'recordings')
 RECORDINGS_BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), RECORDINGS_DIR_RELATIVE_TO_APP))
 RECORDINGS_DIR_NAME = os.path.basename(RECORDINGS_BASE_DIR)
 
-def get_video_duration_and_size(filepath):
-    """Gets video duration using ffprobe and file size."""
-    size = 0
-    if os.path.exists(filepath):
-        size = os.path.getsize(filepath)
-    else:
-        print(f"File not found for size check: {filepath}")
-        return 0, 0 # File doesn't exist, so duration and size are 0
+# Persistent cache of ffprobe results, keyed by session folder and validated against the
+# video's (mtime, size), so only new or changed sessions are probed.
+METADATA_INDEX_PATH = os.path.join(RECORDINGS_BASE_DIR, '.metadata_index.json')
+METADATA_INDEX_VERSION = 1
+metadata_index = None
+metadata_index_lock = threading.Lock()
+
+# Written by the recorder into each session folder; lets us skip ffprobe entirely
+SESSION_MANIFEST_FILENAME = 'session.json'
+
+# Prometheus metrics served at /metrics; histogram bucket bounds in seconds
+REQUEST_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+INDEX_SCAN_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30)
+
+class Histogram:
+    """Thread-safe cumulative histogram rendered in the Prometheus text format."""
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        with self.lock:
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    break
+            else:
+                i = len(self.buckets)
+            self.counts[i] += 1
+            self.sum += value
+
+    def render(self, name, labels=''):
+        """Returns the _bucket/_sum/_count sample lines; labels is e.g. 'route="/"'."""
+        with self.lock:
+            counts, total = list(self.counts), self.sum
+        prefix = f"{labels}," if labels else ''
+        lines, cumulative = [], 0
+        for bound, count in zip(list(self.buckets) + ['+Inf'], counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+        suffix = f"{{{labels}}}" if labels else ''
+        lines.append(f"{name}_sum{suffix} {total:.6f}")
+        lines.append(f"{name}_count{suffix} {cumulative}")
+        return lines
+
+metrics_lock = threading.Lock()
+request_latency = {}  # route rule -> Histogram
+index_scan_seconds = Histogram(INDEX_SCAN_BUCKETS)
+metric_counters = defaultdict(int)  # (metric name, label string) -> count
+
+def count_metric(name, labels=''):
+    with metrics_lock:
+        metric_counters[(name, labels)] += 1
+
+def load_session_manifest(session_dir_path):
+    """Returns the recorder's manifest for a session in any state, or None if it has none."""
+    try:
+        with open(os.path.join(session_dir_path, SESSION_MANIFEST_FILENAME)) as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    return manifest if isinstance(manifest, dict) else None
+
+def read_session_manifest(session_dir_path):
+    """Returns the recorder's manifest for a finished session, or None for legacy/in-progress sessions."""
+    manifest = load_session_manifest(session_dir_path)
+    if not manifest or manifest.get('status') != 'complete':
+        return None
+    return manifest
+
+# Sessions recorded with --output-mode hls publish fMP4 segments and a playlist here while
+# they are being recorded; the folder is removed once the session's recording.mp4 exists
+LIVE_DIR = 'live'
+LIVE_PLAYLIST_FILENAME = 'playlist.m3u8'
+LIVE_STATUSES = ('recording', 'encoding')
+# The recorder rewrites the manifest every minute and adds a segment every minute; a session
+# whose files are older than this was left behind by a crashed recorder
+LIVE_STALE_SECONDS = 5 * 60
+
+def live_playlist_path(session_dir_path, manifest):
+    """Returns the playlist of a session that is still being recorded as HLS, or None."""
+    if not manifest or manifest.get('output_mode') != 'hls' or manifest.get('status') not in LIVE_STATUSES:
+        return None
+    playlist = os.path.join(session_dir_path, LIVE_DIR, LIVE_PLAYLIST_FILENAME)
+    try:
+        updated_at = max(os.path.getmtime(playlist),
+                         os.path.getmtime(os.path.join(session_dir_path, SESSION_MANIFEST_FILENAME)))
+    except OSError:
+        return None
+    return playlist if time.time() - updated_at < LIVE_STALE_SECONDS else None
+
+# Browsers without native HLS play live sessions with this exact hls.js release. A copy
+# saved in static/ at HLS_JS_VENDORED_PATH is served from here; otherwise the same release
+# is loaded from the CDN, pinned to HLS_JS_INTEGRITY when that is set
+HLS_JS_VERSION = '1.5.20'
+HLS_JS_VENDORED_PATH = f'vendor/hls-{HLS_JS_VERSION}.min.js'
+HLS_JS_CDN_URL = f'https://cdn.jsdelivr.net/npm/hls.js@{HLS_JS_VERSION}/dist/hls.min.js'
+HLS_JS_INTEGRITY = ''  # 'sha384-...' of HLS_JS_CDN_URL
+
+def hls_js_source():
+    """Returns (src, integrity) for the hls.js script tag, preferring the vendored copy."""
+    if os.path.isfile(os.path.join(app.static_folder, HLS_JS_VENDORED_PATH)):
+        return url_for('static', filename=HLS_JS_VENDORED_PATH), None
+    return HLS_JS_CDN_URL, HLS_JS_INTEGRITY or None
+
+def evicted_thumbnails(session_folder):
+    """File names of the sprite sheets kept for a session whose video was evicted."""
+    try:
+        with open(os.path.join(RECORDINGS_BASE_DIR, session_folder, SPRITE_DIR, SPRITE_INDEX_FILE)) as f:
+            return list(json.load(f).get('tiles', []))
+    except (OSError, json.JSONDecodeError, AttributeError):
+        return []
+
+# Legacy sessions are probed on a bounded pool, so a cold scan runs PROBE_WORKERS ffprobes at once
+# and concurrent requests for the same file version wait on one shared probe
+PROBE_WORKERS = 4
+PROBE_TIMEOUT = 10
+probe_pool = ThreadPoolExecutor(max_workers=PROBE_WORKERS, thread_name_prefix='ffprobe')
+probes_in_flight = {}
+probes_in_flight_lock = threading.Lock()
+
+def probe_video(filepath):
+    """Gets video duration, resolution and frame count using ffprobe."""
+    metadata = {'duration': 0, 'width': None, 'height': None, 'frame_count': None}
 
     try:
         cmd = [
@@ -33,24 +160,125 @@ def get_video_duration_and_size(filepath):
             '-show_streams',
             filepath
         ]
-        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True, text=True, timeout=10)
+        count_metric('viewer_ffprobe_calls_total')
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True, text=True,
+                                timeout=PROBE_TIMEOUT)
         data = json.loads(result.stdout)
         
-        duration_s = 0
+        video_stream = next((stream for stream in data.get('streams', [])
+                             if stream.get('codec_type') == 'video'), None)
         if 'format' in data and 'duration' in data['format']:
-            duration_s = float(data['format']['duration'])
-        elif 'streams' in data and data['streams']:
-            for stream in data['streams']:
-                if stream.get('codec_type') == 'video' and 'duration' in stream:
-                    duration_s = float(stream['duration'])
-                    break
-        return duration_s, size
+            metadata['duration'] = float(data['format']['duration'])
+        elif video_stream and 'duration' in video_stream:
+            metadata['duration'] = float(video_stream['duration'])
+        if video_stream:
+            metadata['width'] = video_stream.get('width')
+            metadata['height'] = video_stream.get('height')
+            if 'nb_frames' in video_stream:
+                metadata['frame_count'] = int(video_stream['nb_frames'])
+        metadata['probed'] = True
+        return metadata
     except subprocess.TimeoutExpired:
         print(f"ffprobe timed out for {filepath}")
-        return 0, size # Return 0 duration on timeout, but still provide size
-    except (subprocess.CalledProcessError, FileNotFoundError, json.JSONDecodeError, KeyError) as e:
+        return metadata # Return 0 duration on timeout
+    except (subprocess.CalledProcessError, FileNotFoundError, json.JSONDecodeError, KeyError, ValueError) as e:
         print(f"Error processing {filepath} with ffprobe: {e}. Ensure ffprobe is installed and in PATH.")
-        return 0, size # Fallback if ffprobe fails, but still provide size
+        return metadata # Fallback if ffprobe fails
+
+def load_metadata_index():
+    """Loads the on-disk metadata index, starting fresh if it's missing, corrupt or outdated."""
+    try:
+        with open(METADATA_INDEX_PATH) as f:
+            data = json.load(f)
+        if data.get('version') == METADATA_INDEX_VERSION:
+            return data.get('sessions', {})
+    except (OSError, json.JSONDecodeError, AttributeError):
+        pass
+    return {}
+
+def save_metadata_index(sessions):
+    """Atomically writes the metadata index next to the recordings."""
+    tmp_path = None
+    try:
+        # A temp file of its own, so scans saving at the same time never write into each other's
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(METADATA_INDEX_PATH) + '.', suffix='.tmp',
+                                        dir=os.path.dirname(METADATA_INDEX_PATH))
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'version': METADATA_INDEX_VERSION, 'sessions': sessions}, f, separators=(',', ':'))
+        os.replace(tmp_path, METADATA_INDEX_PATH)
+    except OSError as e:
+        print(f"Could not save metadata index {METADATA_INDEX_PATH}: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def request_session_metadata(session_folder, filepath, stat_result):
+    """
+    Returns a Future of (metadata, changed) for a session's video. Cached entries resolve at once;
+    otherwise the video is probed on the pool, only when the index has no entry for it or the
+    file's (mtime, size) changed, and callers asking for the same version share one probe.
+    """
+    global metadata_index
+    with metadata_index_lock:
+        if metadata_index is None:
+            metadata_index = load_metadata_index()
+        entry = metadata_index.get(session_folder)
+    if entry and entry['mtime'] == stat_result.st_mtime and entry['size'] == stat_result.st_size:
+        count_metric('viewer_cache_requests_total', 'cache="metadata",result="hit"')
+        future = Future()
+        future.set_result((entry, False))
+        return future
+
+    key = (session_folder, stat_result.st_mtime, stat_result.st_size)
+    with probes_in_flight_lock:
+        future = probes_in_flight.get(key)
+        if future is None:
+            future = probe_pool.submit(probe_session, session_folder, filepath, stat_result)
+            probes_in_flight[key] = future
+            result = 'miss'
+        else:
+            result = 'shared'
+    if result == 'miss':
+        # Outside the lock: a probe that already finished runs the callback right here
+        future.add_done_callback(lambda _: forget_probe(key))
+    count_metric('viewer_cache_requests_total', f'cache="metadata",result="{result}"')
+    return future
+
+def forget_probe(key):
+    with probes_in_flight_lock:
+        probes_in_flight.pop(key, None)
+
+def get_session_metadata(session_folder, filepath, stat_result):
+    """Blocking form of request_session_metadata: returns (metadata, changed)."""
+    return request_session_metadata(session_folder, filepath, stat_result).result()
+
+def probe_session(session_folder, filepath, stat_result):
+    """Probes a session's video and records the result in the index; runs on the probe pool."""
+    entry = probe_video(filepath)
+    entry['mtime'] = stat_result.st_mtime
+    entry['size'] = stat_result.st_size
+    if not entry.pop('probed', False):
+        # Don't cache failures (e.g. ffprobe missing); try again next scan
+        return entry, False
+    with metadata_index_lock:
+        metadata_index[session_folder] = entry
+    return entry, True
+
+def stale_metadata_entries(live_sessions, prefixes=()):
+    """Index entries for sessions that no longer exist, limited to the scanned prefixes if given."""
+    if metadata_index is None:
+        return []
+    return [session_folder for session_folder in metadata_index
+            if session_folder not in live_sessions and (not prefixes or session_folder.startswith(prefixes))]
+
+def prune_metadata_index(live_sessions, prefixes=()):
+    """Drops index entries for sessions that no longer exist and persists the index."""
+    with metadata_index_lock:
+        if metadata_index is None:
+            return
+        for session_folder in stale_metadata_entries(live_sessions, prefixes):
+            del metadata_index[session_folder]
+        snapshot = dict(metadata_index)
+    save_metadata_index(snapshot)
 
 def format_duration(seconds):
     """Formats duration in seconds to HH:MM:SS or MM:SS string."""
@@ -79,10 +307,68 @@ def format_size(size_bytes):
     else:
         return f"{size_bytes/1024**3:.1f} GB"
 
-def get_recordings_info():
+# Session folders are named after the local time they started: YYYYMMDD_HHMMSS
+SESSION_FOLDER_PATTERN = re.compile(r"^(\d{8})_(\d{6})$")
+
+def list_session_folders(prefixes=()):
+    """
+    Returns the sorted session folder names, optionally only those starting with one of the
+    given prefixes (e.g. '20261017_'), so a single day can be looked up without scanning the rest.
+    """
+    try:
+        names = os.listdir(RECORDINGS_BASE_DIR)
+    except OSError:
+        return []
+    return sorted(name for name in names
+                  if (not prefixes or name.startswith(prefixes)) and SESSION_FOLDER_PATTERN.match(name))
+
+def list_recorded_days():
+    """Returns the days (YYYY-MM-DD) that have session folders, newest first, from folder names alone."""
+    days = {f"{name[:4]}-{name[4:6]}-{name[6:8]}" for name in list_session_folders()}
+    return sorted(days, reverse=True)
+
+def recording_entry(metadata, item_name, video_filepath, manifest, raw_manifest, live, evicted, start_timestamp,
+                    time_formatted):
+    """Builds the day view's description of one session from its metadata and manifest."""
+    duration, size = metadata['duration'], metadata['size']
+    # Changes whenever the video is rewritten, so URLs can be cached as immutable
+    version = f"{size:x}-{int(metadata.get('mtime') or (manifest or {}).get('end_timestamp') or 0):x}"
+
+    # Use session folder name as a unique identifier for the recording in the day view
+    # and to construct the path for serving the file.
+    return {
+        'filename': os.path.basename(video_filepath), # Actual filename (recording.mp4)
+        'session_folder': item_name, # e.g., 20250609_224319
+        'path': video_filepath,
+        'duration': duration,
+        'duration_formatted': format_duration(duration),
+        'size': size,
+        'size_formatted': format_size(size),
+        'width': metadata['width'],
+        'height': metadata['height'],
+        'frame_count': metadata['frame_count'],
+        'version': version,
+        'live': live,
+        'evicted': evicted,
+        'thumbnails': evicted_thumbnails(item_name) if evicted else [],
+        # Compacted days merged into one video list the sessions they came from
+        'merged_sessions': len((manifest or {}).get('parts') or []),
+        'compacted': bool((raw_manifest or {}).get('compaction')),
+        # Wall-clock spans covered by the video, for seeking from the activity heatmap
+        'spans': [[part['start_timestamp'], part['offset'], part['duration']]
+                  for part in (manifest or {}).get('parts') or [] if part.get('start_timestamp')]
+                 or [[start_timestamp, 0, duration]],
+        # Multi-display sessions tile every display into the frame; boxes are fractions of it
+        'displays': (raw_manifest or {}).get('displays') or [],
+        'display_name': f"Recording from {time_formatted}", # For display in UI
+        'time_formatted': time_formatted # Store for potential direct use
+    }
+
+def get_recordings_info(days=None):
     """
     Scans session subfolders (YYYYMMDD_HHMMSS) in RECORDINGS_BASE_DIR for 'recording.mp4' files,
     groups them by day, and calculates total duration for each day.
+    With days (a list of YYYY-MM-DD), only the session folders of those days are scanned.
     """
     daily_recordings = defaultdict(lambda: {'files': [], 'total_duration': 0, 'count': 0})
     
@@ -90,14 +376,26 @@ def get_recordings_info():
         print(f"Recordings directory not found: {RECORDINGS_BASE_DIR}")
         return [], RECORDINGS_BASE_DIR, RECORDINGS_DIR_NAME
 
-    # Regex to match session folder names like YYYYMMDD_HHMMSS
-    session_folder_pattern = re.compile(r"^(\d{8})_(\d{6})$")
     video_filename = "recording.mp4"
+    prefixes = tuple(day.replace('-', '') + '_' for day in days) if days is not None else ()
+    if days is not None and not prefixes:
+        return [], RECORDINGS_BASE_DIR, RECORDINGS_DIR_NAME
 
-    for item_name in os.listdir(RECORDINGS_BASE_DIR):
+    live_sessions = set()
+    index_changed = False
+    scan_started = time.perf_counter()
+    # Legacy sessions waiting on ffprobe; they're added once every probe for the scan has been started
+    pending = []
+
+    def add_recording(date_key, recording):
+        daily_recordings[date_key]['files'].append(recording)
+        daily_recordings[date_key]['total_duration'] += recording['duration']
+        daily_recordings[date_key]['count'] += 1
+
+    for item_name in list_session_folders(prefixes):
         session_dir_path = os.path.join(RECORDINGS_BASE_DIR, item_name)
         if os.path.isdir(session_dir_path):
-            match = session_folder_pattern.match(item_name)
+            match = SESSION_FOLDER_PATTERN.match(item_name)
             if match:
                 date_str_yyyymmdd = match.group(1) # YYYYMMDD
                 # Convert YYYYMMDD to YYYY-MM-DD for consistency and easier parsing
@@ -108,35 +406,80 @@ def get_recordings_info():
                     try:
                         time_obj_from_folder = datetime.strptime(time_str_hhmmss, "%H%M%S")
                         time_formatted = time_obj_from_folder.strftime("%I:%M:%S %p") # e.g., 10:30:15 PM
+                        start_timestamp = datetime.combine(date_obj_from_folder.date(), time_obj_from_folder.time()).timestamp()
                     except ValueError:
                         time_formatted = time_str_hhmmss # Fallback to raw HHMMSS
+                        start_timestamp = date_obj_from_folder.timestamp()
 
                 except ValueError:
                     print(f"Skipping folder with invalid date format: {item_name}")
                     continue
 
                 video_filepath = os.path.join(session_dir_path, video_filename)
-                
-                if os.path.exists(video_filepath) and os.path.isfile(video_filepath):
-                    duration, size = get_video_duration_and_size(video_filepath)
-                    
-                    # Use session folder name as a unique identifier for the recording in the day view
-                    # and to construct the path for serving the file.
-                    daily_recordings[date_key]['files'].append({
-                        'filename': video_filename, # Actual filename (recording.mp4)
-                        'session_folder': item_name, # e.g., 20250609_224319
-                        'path': video_filepath,
-                        'duration': duration,
-                        'duration_formatted': format_duration(duration),
-                        'size': size,
-                        'size_formatted': format_size(size),
-                        'display_name': f"Recording from {time_formatted}", # For display in UI
-                        'time_formatted': time_formatted # Store for potential direct use
-                    })
-                    daily_recordings[date_key]['total_duration'] += duration
-                    daily_recordings[date_key]['count'] += 1
+                raw_manifest = load_session_manifest(session_dir_path)
+                manifest = raw_manifest if raw_manifest and raw_manifest.get('status') == 'complete' else None
+                live = False
+                evicted = bool(raw_manifest) and raw_manifest.get('status') == 'evicted'
+
+                if manifest:
+                    metadata = {
+                        'duration': manifest.get('duration') or 0,
+                        'size': manifest.get('video_size') or 0,
+                        'width': manifest.get('width'),
+                        'height': manifest.get('height'),
+                        'frame_count': manifest.get('frame_count'),
+                    }
+                elif live_playlist_path(session_dir_path, raw_manifest):
+                    # Still recording: size the session from its segments and the clock
+                    live = True
+                    live_dir = os.path.join(session_dir_path, LIVE_DIR)
+                    end = raw_manifest.get('end_timestamp') or time.time()
+                    metadata = {
+                        'duration': max(end - raw_manifest.get('start_timestamp', end), 0),
+                        'size': sum(entry.stat().st_size for entry in os.scandir(live_dir) if entry.is_file()),
+                        'width': raw_manifest.get('width'),
+                        'height': raw_manifest.get('height'),
+                        'frame_count': raw_manifest.get('frame_count'),
+                    }
+                elif evicted:
+                    # Video deleted to stay under the disk budget; the manifest and thumbnails remain
+                    metadata = {
+                        'duration': raw_manifest.get('duration') or 0,
+                        'size': 0,
+                        'width': raw_manifest.get('width'),
+                        'height': raw_manifest.get('height'),
+                        'frame_count': raw_manifest.get('frame_count'),
+                    }
+                elif os.path.isfile(video_filepath):
+                    # Legacy session without a manifest: fall back to the ffprobe index
+                    metadata = request_session_metadata(item_name, video_filepath, os.stat(video_filepath))
+                    live_sessions.add(item_name)
+                else:
+                    metadata = None
+
+                if (manifest or live or evicted) and raw_manifest.get('start_timestamp'):
+                    start_timestamp = raw_manifest['start_timestamp']
+                    started = datetime.fromtimestamp(start_timestamp)
+                    date_key = started.strftime("%Y-%m-%d")
+                    time_formatted = started.strftime("%I:%M:%S %p")
+
+                if isinstance(metadata, Future):
+                    pending.append((date_key, metadata, (item_name, video_filepath, manifest, raw_manifest,
+                                                         live, evicted, start_timestamp, time_formatted)))
+                elif metadata:
+                    add_recording(date_key, recording_entry(metadata, item_name, video_filepath, manifest, raw_manifest,
+                                                            live, evicted, start_timestamp, time_formatted))
                 else:
                     print(f"No '{video_filename}' found in session folder: {session_dir_path}")
+
+    for date_key, future, details in pending:
+        metadata, changed = future.result()
+        index_changed = index_changed or changed
+        add_recording(date_key, recording_entry(metadata, *details))
+
+    if index_changed or stale_metadata_entries(live_sessions, prefixes):
+        prune_metadata_index(live_sessions, prefixes)
+    index_scan_seconds.observe(time.perf_counter() - scan_started)
             
     sorted_days = sorted(daily_recordings.items(), key=lambda item: item[0], reverse=True)
     
@@ -159,19 +502,86 @@ def get_recordings_info():
         })
     return processed_info, RECORDINGS_BASE_DIR, RECORDINGS_DIR_NAME
 
-@app.route('/')
-def index():
-    days_data, base_path, dir_name = get_recordings_info()
-    days_summary = [{
+# Days per page on the timeline and /api/days, and sessions per page on /api/days/<date>/sessions
+DAYS_PAGE_SIZE = 30
+SESSIONS_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+def page_limit(default):
+    """Reads ?limit= for a paginated endpoint, clamped to 1..MAX_PAGE_SIZE."""
+    try:
+        limit = int(request.args.get('limit', default))
+    except ValueError:
+        abort(400, description="Invalid limit.")
+    return min(max(limit, 1), MAX_PAGE_SIZE)
+
+def get_days_page(cursor, limit):
+    """
+    Returns (day summaries, next cursor) for up to limit days older than cursor (YYYY-MM-DD),
+    newest first. Days are paged by folder name, so only the folders of the returned days are scanned.
+    """
+    days = [day for day in list_recorded_days() if not cursor or day < cursor]
+    page = days[:limit]
+    days_data, _, _ = get_recordings_info(days=page)
+    summaries = [{
         'date': day['date'],
         'date_formatted': day['date_formatted'],
         'count': day['count'],
-        'total_duration_formatted': day['total_duration_formatted']
-    } for day in days_data]
+        'total_duration': day['total_duration'],
+        'total_duration_formatted': day['total_duration_formatted'],
+        'url': url_for('view_day', date_str=day['date']),
+    } for day in days_data if day['date'] in page]
+    return summaries, page[-1] if len(days) > limit else None
+
+def session_summary(recording):
+    """JSON-friendly view of one recording from get_recordings_info, with the URLs to play it."""
+    folder = recording['session_folder']
+    summary = {key: recording[key] for key in (
+        'session_folder', 'display_name', 'time_formatted', 'duration', 'duration_formatted', 'size',
+        'size_formatted', 'width', 'height', 'frame_count', 'live', 'evicted', 'compacted', 'merged_sessions', 'spans',
+        'displays')}
+    summary['video_url'] = None if recording['evicted'] or recording['live'] else url_for(
+        'serve_recording', session_folder_name=folder, filename=recording['filename'], v=recording['version'])
+    summary['live_url'] = url_for('serve_live', session_folder_name=folder, filename='playlist.m3u8') if recording['live'] else None
+    summary['sprites_url'] = url_for('serve_sprites', session_folder_name=folder, filename=SPRITE_INDEX_FILE)
+    summary['thumbnails'] = [url_for('serve_sprites', session_folder_name=folder, filename=tile)
+                             for tile in recording['thumbnails']]
+    return summary
+
+@app.route('/')
+def index():
+    cursor = request.args.get('cursor')
+    days_summary, next_cursor = get_days_page(cursor, DAYS_PAGE_SIZE)
     return render_template('index.html', 
                            days_with_recordings=days_summary, 
-                           recordings_base_path=base_path, 
-                           recordings_dir_name=dir_name)
+                           next_cursor=next_cursor,
+                           recordings_base_path=RECORDINGS_BASE_DIR, 
+                           recordings_dir_name=RECORDINGS_DIR_NAME)
+
+@app.route('/api/days')
+def api_days():
+    """Recorded days, newest first: ?limit= per page, and ?cursor= set to the previous page's next_cursor."""
+    days_summary, next_cursor = get_days_page(request.args.get('cursor'), page_limit(DAYS_PAGE_SIZE))
+    return jsonify({'days': days_summary, 'next_cursor': next_cursor})
+
+@app.route('/api/days/<date_str>/sessions')
+def api_day_sessions(date_str):
+    """A day's recordings in start order, paginated like /api/days; only that day's folders are scanned."""
+    try:
+        datetime.strptime(date_str, "%Y-%m-%d")
+    except ValueError:
+        abort(400, description="Invalid date format. Please use YYYY-MM-DD.")
+    cursor = request.args.get('cursor')
+    limit = page_limit(SESSIONS_PAGE_SIZE)
+    days_data, _, _ = get_recordings_info(days=[date_str])
+    recordings = next((day['recordings'] for day in days_data if day['date'] == date_str), [])
+    recordings = [recording for recording in recordings if not cursor or recording['session_folder'] > cursor]
+    page = recordings[:limit]
+    return jsonify({
+        'date': date_str,
+        'sessions': [session_summary(recording) for recording in page],
+        'next_cursor': page[-1]['session_folder'] if len(recordings) > limit else None,
+    })
 
 @app.route('/day/<date_str>')
 def view_day(date_str):
@@ -180,7 +590,7 @@ def view_day(date_str):
     except ValueError:
         abort(404, description="Invalid date format. Please use YYYY-MM-DD.")
 
-    all_days_data, _, _ = get_recordings_info()
+    all_days_data, _, _ = get_recordings_info(days=[date_str])
     day_data = next((day for day in all_days_data if day['date'] == date_str), None)
 
     date_obj_for_title = datetime.strptime(date_str, "%Y-%m-%d")
@@ -195,7 +605,107 @@ def view_day(date_str):
     return render_template('day_view.html', 
                            date_str=day_data['date'], 
                            date_formatted=day_data['date_formatted'], 
-                           recordings=day_data['recordings'])
+                           recordings=day_data['recordings'],
+                           hls_js=hls_js_source())
+
+# Finished recordings never change under the same versioned URL, so let browsers keep them
+FINISHED_RECORDING_MAX_AGE = 365 * 24 * 60 * 60
+# Multi-range responses are streamed in chunks of this size
+RANGE_CHUNK_SIZE = 256 * 1024
+
+def recording_etag(stat_result):
+    """Strong ETag derived from the file's mtime and size."""
+    return f"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"
+
+BYTE_RANGE_SPEC = re.compile(r"(\d*)-(\d*)")
+
+def parse_byte_ranges(header, complete_length):
+    """
+    Parses a raw Range header into sorted, merged (start, stop) byte offsets. werkzeug's parser
+    rejects overlapping or out-of-order ranges, which are valid and which a server may merge.
+    Returns None if the header isn't a valid bytes range (so it is ignored), or an empty list
+    if no range is satisfiable.
+    """
+    units, _, specs = header.partition('=')
+    if units.strip().lower() != 'bytes':
+        return None
+    resolved = []
+    for spec in specs.split(','):
+        match = BYTE_RANGE_SPEC.fullmatch(spec.strip())
+        if not match or not (match.group(1) or match.group(2)):
+            return None
+        first, last = match.groups()
+        if not first:  # Suffix range, e.g. bytes=-500
+            start, stop = max(complete_length - int(last), 0), complete_length
+        else:
+            start = int(first)
+            if last and int(last) < start:
+                return None
+            stop = complete_length if not last else min(int(last) + 1, complete_length)
+        if start < stop:
+            resolved.append((start, stop))
+    merged = []
+    for start, stop in sorted(resolved):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], stop))
+        else:
+            merged.append((start, stop))
+    return merged
+
+def serve_byte_ranges(filepath, ranges, complete_length, etag, last_modified, max_age):
+    """Builds a 206 response for ranges werkzeug can't serve itself (more than one range)."""
+    def read_range(f, start, stop):
+        f.seek(start)
+        remaining = stop - start
+        while remaining > 0:
+            chunk = f.read(min(RANGE_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+    if len(ranges) == 1:
+        start, stop = ranges[0]
+        def generate():
+            with open(filepath, 'rb') as f:
+                yield from read_range(f, start, stop)
+        response = Response(generate(), status=206, mimetype='video/mp4', direct_passthrough=True)
+        response.headers['Content-Range'] = f"bytes {start}-{stop - 1}/{complete_length}"
+        response.content_length = stop - start
+    else:
+        boundary = uuid.uuid4().hex
+        part_headers = [
+            (f"--{boundary}\r\nContent-Type: video/mp4\r\n"
+             f"Content-Range: bytes {start}-{stop - 1}/{complete_length}\r\n\r\n").encode()
+            for start, stop in ranges
+        ]
+        closing = f"\r\n--{boundary}--\r\n".encode()
+        def generate():
+            with open(filepath, 'rb') as f:
+                for index, (start, stop) in enumerate(ranges):
+                    yield (b"\r\n" if index else b"") + part_headers[index]
+                    yield from read_range(f, start, stop)
+                yield closing
+        response = Response(generate(), status=206, direct_passthrough=True,
+                            content_type=f"multipart/byteranges; boundary={boundary}")
+        response.content_length = (sum(len(header) for header in part_headers) + 2 * (len(ranges) - 1)
+                                   + sum(stop - start for start, stop in ranges) + len(closing))
+
+    response.accept_ranges = 'bytes'
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    set_recording_cache_headers(response, max_age)
+    return response
+
+def set_recording_cache_headers(response, max_age):
+    """Long-lived immutable caching for finished sessions, revalidation otherwise."""
+    if max_age:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        response.cache_control.immutable = True
+        response.cache_control.no_cache = None
+    else:
+        response.cache_control.no_cache = True
 
 @app.route('/recordings/<session_folder_name>/<filename>')
 def serve_recording(session_folder_name, filename):
@@ -215,20 +725,784 @@ def serve_recording(session_folder_name, filename):
     if not os.path.exists(video_filepath) or not os.path.isfile(video_filepath):
         print(f"Attempted to serve non-existent file: {video_filepath}")
         abort(404, description="Recording not found at expected path.")
-        
-    # Serve the file from the specific session directory
-    return send_from_directory(session_dir_path, filename, as_attachment=False)
 
-if __name__ == '__main__':
+    stat_result = os.stat(video_filepath)
+    etag = recording_etag(stat_result)
+    last_modified = datetime.fromtimestamp(int(stat_result.st_mtime), timezone.utc)
+    # Legacy sessions have no manifest; otherwise the video may still be being written
+    manifest = load_session_manifest(session_dir_path)
+    finished = manifest is None or manifest.get('status') == 'complete'
+    max_age = FINISHED_RECORDING_MAX_AGE if finished else 0
+
+    # werkzeug handles conditionals and single ranges; only multi-range requests need us
+    range_header = request.headers.get('Range', '')
+    ranges = parse_byte_ranges(range_header, stat_result.st_size) if ',' in range_header else None
+    if ranges is not None:
+        not_modified = (request.if_none_match.contains(etag)
+                        or (not request.if_none_match and request.if_modified_since is not None
+                            and request.if_modified_since >= last_modified))
+        if_range = request.if_range
+        range_applies = (not (if_range.etag or if_range.date) or if_range.etag == etag
+                         or if_range.date == last_modified)
+        if not_modified:
+            # werkzeug would reject the multi-range header before checking validators
+            response = Response(status=304)
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            set_recording_cache_headers(response, max_age)
+            return response
+        if range_applies:
+            if not ranges:
+                abort(416)
+            return serve_byte_ranges(video_filepath, ranges, stat_result.st_size, etag, last_modified, max_age)
+
+    # Serve the file from the specific session directory. Full responses go through the
+    # server's wsgi.file_wrapper, which lets servers that support it use sendfile.
+    response = send_from_directory(session_dir_path, filename, as_attachment=False,
+                                   etag=etag, last_modified=last_modified)
+    set_recording_cache_headers(response, max_age)
+    return response
+
+@app.route('/live/<session_folder_name>/<filename>')
+def serve_live(session_folder_name, filename):
+    """Serves the playlist and fMP4 segments of a session that is still being recorded."""
+    if not re.fullmatch(r"\d{8}_\d{6}", session_folder_name):
+        abort(400, description="Invalid session folder format in URL.")
+    if filename != LIVE_PLAYLIST_FILENAME and not re.fullmatch(r"init\.mp4|segment_\d{5}\.m4s", filename):
+        abort(400, description="Invalid or disallowed filename.")
+    live_dir = os.path.join(RECORDINGS_BASE_DIR, session_folder_name, LIVE_DIR)
+    if not os.path.isfile(os.path.join(live_dir, filename)):
+        # The session finished and its segments were merged into recording.mp4
+        abort(404, description="Live segment not found.")
+    if filename == LIVE_PLAYLIST_FILENAME:
+        # The playlist grows every segment; players must always refetch it
+        response = send_from_directory(live_dir, filename, mimetype='application/vnd.apple.mpegurl')
+        response.cache_control.no_cache = True
+        return response
+    # Segments are written under a temporary name and never change once they appear
+    response = send_from_directory(live_dir, filename, max_age=24 * 60 * 60,
+                                   mimetype='video/iso.segment' if filename.endswith('.m4s') else 'video/mp4')
+    response.cache_control.immutable = True
+    return response
+
+# Scrubbing sprite sheets, in the same layout the recorder writes after each session
+SPRITE_DIR = 'sprites'
+SPRITE_INDEX_FILE = 'sprites.json'
+SPRITE_INTERVAL = 60
+SPRITE_THUMB_SIZE = (160, 90)
+SPRITE_COLUMNS = 10
+SPRITE_ROWS = 10
+sprite_locks = defaultdict(threading.Lock)
+sprite_locks_guard = threading.Lock()
+
+def load_sprite_index(sprite_dir, video_stat):
+    """Returns a session's sprite index if it exists and matches the current video."""
+    try:
+        with open(os.path.join(sprite_dir, SPRITE_INDEX_FILE)) as f:
+            index = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if index.get('video_mtime') != video_stat.st_mtime or index.get('video_size') != video_stat.st_size:
+        return None
+    return index
+
+def generate_sprites(session_dir_path, video_filepath, duration):
+    """Builds sprite sheets for a session with ffmpeg and writes their index. Returns the index or None."""
+    sprite_dir = os.path.join(session_dir_path, SPRITE_DIR)
+    os.makedirs(sprite_dir, exist_ok=True)
+    for old_tile in os.listdir(sprite_dir):
+        if old_tile.startswith('sprite_') and old_tile.endswith('.jpg'):
+            os.remove(os.path.join(sprite_dir, old_tile))
+
+    thumb_width, thumb_height = SPRITE_THUMB_SIZE
+    cmd = [
+        'ffmpeg', '-y',
+        '-loglevel', 'error',
+        '-i', video_filepath,
+        '-vf', (f"fps=1/{SPRITE_INTERVAL},"
+                f"scale={thumb_width}:{thumb_height}:force_original_aspect_ratio=decrease,"
+                f"pad={thumb_width}:{thumb_height}:(ow-iw)/2:(oh-ih)/2,"
+                f"tile={SPRITE_COLUMNS}x{SPRITE_ROWS}"),
+        '-q:v', '5',
+        os.path.join(sprite_dir, 'sprite_%03d.jpg')
+    ]
+    try:
+        subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.DEVNULL, check=True)
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        print(f"Error generating sprites for {video_filepath}: {e}. Ensure ffmpeg is installed and in PATH.")
+        return None
+
+    video_stat = os.stat(video_filepath)
+    index = {
+        'interval': SPRITE_INTERVAL,
+        'thumb_width': thumb_width,
+        'thumb_height': thumb_height,
+        'columns': SPRITE_COLUMNS,
+        'rows': SPRITE_ROWS,
+        'count': int(duration // SPRITE_INTERVAL) + 1,
+        'tiles': sorted(f for f in os.listdir(sprite_dir) if f.startswith('sprite_') and f.endswith('.jpg')),
+        'video_mtime': video_stat.st_mtime,
+        'video_size': video_stat.st_size,
+    }
+    tmp_path = os.path.join(sprite_dir, SPRITE_INDEX_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp_path, os.path.join(sprite_dir, SPRITE_INDEX_FILE))
+    return index
+
+def get_session_sprites(session_folder_name):
+    """
+    Returns the sprite index for a session, generating sprites on first use (or when the video
+    changed) and caching them in the session folder. Returns None if they can't be built.
+    """
+    session_dir_path = os.path.join(RECORDINGS_BASE_DIR, session_folder_name)
+    video_filepath = os.path.join(session_dir_path, 'recording.mp4')
+    if not os.path.isfile(video_filepath):
+        return None
+    sprite_dir = os.path.join(session_dir_path, SPRITE_DIR)
+
+    with sprite_locks_guard:
+        lock = sprite_locks[session_folder_name]
+    # One generation per session at a time; concurrent requests wait and reuse the result
+    with lock:
+        video_stat = os.stat(video_filepath)
+        index = load_sprite_index(sprite_dir, video_stat)
+        if index:
+            return index
+        manifest = read_session_manifest(session_dir_path)
+        if manifest:
+            duration = manifest.get('duration') or 0
+        else:
+            duration = get_session_metadata(session_folder_name, video_filepath, video_stat)[0]['duration']
+        if not duration:
+            return None
+        return generate_sprites(session_dir_path, video_filepath, duration)
+
+@app.route('/sprites/<session_folder_name>/<filename>')
+def serve_sprites(session_folder_name, filename):
+    session_folder_pattern = re.compile(r"^(\d{8})_(\d{6})$")
+    if not session_folder_pattern.match(session_folder_name):
+        abort(400, description="Invalid session folder format in URL.")
+
+    if filename == SPRITE_INDEX_FILE:
+        index = get_session_sprites(session_folder_name)
+        if not index:
+            abort(404, description="Sprites are not available for this recording.")
+        version = f"{index['video_size']:x}-{int(index['video_mtime']):x}"
+        response = jsonify({
+            'interval': index['interval'],
+            'thumb_width': index['thumb_width'],
+            'thumb_height': index['thumb_height'],
+            'columns': index['columns'],
+            'rows': index['rows'],
+            'count': index['count'],
+            'tiles': [url_for('serve_sprites', session_folder_name=session_folder_name, filename=tile, v=version)
+                      for tile in index['tiles']],
+        })
+        response.cache_control.no_cache = True
+        response.add_etag()
+        return response.make_conditional(request)
+
+    if not re.fullmatch(r"sprite_\d{3}\.jpg", filename):
+        abort(400, description="Invalid or disallowed filename.")
+    sprite_dir = os.path.join(RECORDINGS_BASE_DIR, session_folder_name, SPRITE_DIR)
+    if not os.path.isfile(os.path.join(sprite_dir, filename)):
+        abort(404, description="Sprite not found.")
+    # Tile URLs are versioned by the video they were built from
+    response = send_from_directory(sprite_dir, filename, max_age=FINISHED_RECORDING_MAX_AGE)
+    response.cache_control.immutable = True
+    return response
+
+# Single frames extracted for /api/frame, kept in memory up to this many bytes
+FRAME_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Each extraction also decodes this many indexed frames on either side of the requested one
+FRAME_PREFETCH = 5
+# (encoder, mimetype, quality args): mjpeg's -q:v runs 2 (best) to 31, libwebp's -quality 0 to 100 (best)
+FRAME_FORMATS = {
+    'jpeg': ('mjpeg', 'image/jpeg', ['-q:v', '4']),
+    'webp': ('libwebp', 'image/webp', ['-quality', '80']),
+}
+TIMESTAMP_INDEX_FILENAME = 'timestamps.txt'
+
+class FrameCache:
+    """Thread-safe LRU cache of encoded frames, evicting least recently used entries by total size."""
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            data = self.entries.get(key)
+            if data is not None:
+                self.entries.move_to_end(key)
+        count_metric('viewer_cache_requests_total', f'cache="frame",result="{"miss" if data is None else "hit"}"')
+        return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= len(previous)
+            self.entries[key] = data
+            self.total_bytes += len(data)
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+
+frame_cache = FrameCache(FRAME_CACHE_MAX_BYTES)
+timestamp_index_cache = {}
+timestamp_index_lock = threading.Lock()
+
+def read_timestamp_index(session_dir_path):
+    """
+    Returns the recorder's capture timestamps for a session as a sorted list of unix times
+    (position = frame number), or None if the session has no index. Parsed once per file version.
+    """
+    index_path = os.path.join(session_dir_path, TIMESTAMP_INDEX_FILENAME)
+    try:
+        stat_result = os.stat(index_path)
+    except OSError:
+        return None
+    cache_key = (stat_result.st_mtime_ns, stat_result.st_size)
+    with timestamp_index_lock:
+        cached = timestamp_index_cache.get(session_dir_path)
+    if cached and cached[0] == cache_key:
+        return cached[1]
+
+    timestamps = []
+    with open(index_path) as f:
+        for line in f:
+            try:
+                timestamps.append(float(line.split()[1]))
+            except (IndexError, ValueError):
+                continue
+    with timestamp_index_lock:
+        timestamp_index_cache[session_dir_path] = (cache_key, timestamps)
+    return timestamps
+
+def find_session_at(moment):
+    """
+    Finds the session whose recording covers a local datetime.
+    Returns (session_folder, start_timestamp, duration, manifest) or None.
+    """
+    target = moment.timestamp()
+    # A session covering this moment started on the same day or, across midnight, the day before
+    prefixes = tuple((moment - timedelta(days=days)).strftime("%Y%m%d_") for days in (0, 1))
+    for session_folder in reversed(list_session_folders(prefixes)):
+        session_dir_path = os.path.join(RECORDINGS_BASE_DIR, session_folder)
+        video_filepath = os.path.join(session_dir_path, 'recording.mp4')
+        manifest = read_session_manifest(session_dir_path)
+        if manifest and manifest.get('start_timestamp'):
+            start, duration = manifest['start_timestamp'], manifest.get('duration') or 0
+            # A compacted day is several sessions back to back: find the part covering the target
+            # and shift start so that target - start is still the offset into the video
+            for part in reversed(manifest.get('parts') or []):
+                if part.get('start_timestamp') and part['start_timestamp'] <= target:
+                    start = part['start_timestamp'] - part['offset']
+                    duration = part['offset'] + part['duration']
+                    break
+        elif os.path.isfile(video_filepath):
+            start = datetime.strptime(session_folder, "%Y%m%d_%H%M%S").timestamp()
+            duration = get_session_metadata(session_folder, video_filepath, os.stat(video_filepath))[0]['duration']
+        else:
+            continue
+        if start <= target:
+            # Sessions are sorted newest first, so only the latest one starting before the target can cover it
+            if target <= start + duration + 1:
+                return session_folder, start, duration, manifest
+            return None
+    return None
+
+def frame_offsets(session_dir_path, manifest):
+    """
+    Returns (capture_timestamps, video_offsets) for a session's indexed frames, mirroring how the
+    recorder timed them: real capture times for variable-frame-rate videos, frame_number / fps otherwise.
+    Returns (None, None) for sessions without an index.
+    """
+    timestamps = read_timestamp_index(session_dir_path)
+    if not timestamps:
+        return None, None
+    if manifest and not manifest.get('variable_frame_rate', True) and manifest.get('fps'):
+        offsets = [n / manifest['fps'] for n in range(len(timestamps))]
+    else:
+        offsets = [ts - timestamps[0] for ts in timestamps]
+    return timestamps, offsets
+
+def split_jpeg_stream(data):
+    """Splits concatenated baseline JPEGs (as written by ffmpeg's mjpeg encoder) into images."""
+    images = []
+    start = 0
+    while True:
+        end = data.find(b'\xff\xd9', start)
+        if end < 0:
+            return images
+        images.append(data[start:end + 2])
+        start = end + 2
+
+def extract_frames(video_filepath, seek, duration, image_format, max_frames):
+    """Decodes frames from a window of a video, seeking to the nearest keyframe on input."""
+    codec, _, quality_args = FRAME_FORMATS[image_format]
+    cmd = [
+        'ffmpeg', '-v', 'error',
+        '-ss', f"{max(seek, 0):.3f}",
+        '-i', video_filepath,
+        '-t', f"{duration:.3f}",
+        '-frames:v', str(max_frames),
+        '-fps_mode', 'passthrough',
+        '-f', 'image2pipe',
+        '-c:v', codec,
+        *quality_args,
+        '-'
+    ]
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.DEVNULL,
+                            check=True, timeout=20)
+    return result.stdout
+
+def get_frame_at(moment, image_format):
+    """
+    Returns (image bytes, capture time, cache hit) for the frame nearest a local datetime, or None.
+    Indexed sessions decode a small window around the frame in one ffmpeg call and cache every
+    frame in it, so neighbouring lookups are served from memory.
+    """
+    found = find_session_at(moment)
+    if not found:
+        return None
+    session_folder, start, duration, manifest = found
+    session_dir_path = os.path.join(RECORDINGS_BASE_DIR, session_folder)
+    video_filepath = os.path.join(session_dir_path, 'recording.mp4')
+    target = moment.timestamp()
+    video_version = recording_etag(os.stat(video_filepath))
+
+    timestamps, offsets = frame_offsets(session_dir_path, manifest)
+    if not timestamps:
+        # No index: address frames by whole seconds into the video
+        offset = min(max(round(target - start), 0), max(int(duration) - 1, 0))
+        key = (session_folder, video_version, 'second', offset, image_format)
+        data = frame_cache.get(key)
+        if data is not None:
+            return data, start + offset, True
+        data = extract_frames(video_filepath, offset, 1, image_format, 1)
+        if not data:
+            return None
+        frame_cache.put(key, data)
+        return data, start + offset, False
+
+    # Frames are held until the next capture, so pick the last one captured at or before the target
+    frame_number = max(bisect.bisect_right(timestamps, target) - 1, 0)
+    key = (session_folder, video_version, frame_number, image_format)
+    data = frame_cache.get(key)
+    if data is not None:
+        return data, timestamps[frame_number], True
+
+    # Only JPEG output can be split back into frames, so only JPEG prefetches a window
+    if image_format == 'jpeg':
+        first = max(frame_number - FRAME_PREFETCH, 0)
+        last = min(frame_number + FRAME_PREFETCH, len(offsets) - 1)
+        # Seek to the midpoints between frames so slightly-off timestamps can't shift the window
+        window_start = (offsets[first - 1] + offsets[first]) / 2 if first > 0 else 0
+        window_end = (offsets[last] + offsets[last + 1]) / 2 if last + 1 < len(offsets) else offsets[last] + 1
+        expected = last - first + 1
+        images = split_jpeg_stream(extract_frames(video_filepath, window_start, window_end - window_start,
+                                                  image_format, expected))
+        if len(images) == expected:
+            for number, image in zip(range(first, last + 1), images):
+                frame_cache.put((session_folder, video_version, number, image_format), image)
+            return images[frame_number - first], timestamps[frame_number], False
+
+    # WebP, or a window that didn't line up with the index: fetch just this frame
+    data = extract_frames(video_filepath, offsets[frame_number], 1, image_format, 1)
+    if not data:
+        return None
+    frame_cache.put(key, data)
+    return data, timestamps[frame_number], False
+
+@app.route('/api/frame')
+def api_frame():
+    """Returns the screen as it was at ?at=<ISO local time> (e.g. 2026-10-17T14:32:10) as JPEG or WebP."""
+    at = request.args.get('at', '')
+    image_format = request.args.get('format', 'jpeg').lower()
+    if image_format not in FRAME_FORMATS:
+        abort(400, description="Unsupported format. Use jpeg or webp.")
+    try:
+        moment = datetime.fromisoformat(at)
+    except ValueError:
+        abort(400, description="Invalid 'at' timestamp. Use ISO format, e.g. 2026-10-17T14:32:10.")
+    if moment.tzinfo is not None:
+        moment = moment.astimezone().replace(tzinfo=None)
+
+    try:
+        result = get_frame_at(moment, image_format)
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError) as e:
+        print(f"Error extracting frame at {at}: {e}")
+        abort(500, description="Could not extract frame. Ensure ffmpeg is installed and in PATH.")
+    if not result:
+        abort(404, description="No recording covers that time.")
+
+    data, captured_at, cache_hit = result
+    response = Response(data, mimetype=FRAME_FORMATS[image_format][1])
+    response.headers['X-Frame-Time'] = datetime.fromtimestamp(captured_at).isoformat(timespec='seconds')
+    response.headers['X-Cache'] = 'hit' if cache_hit else 'miss'
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    return response
+
+# Written by the recorder into each session folder: one (uint32 unix time, float16 score) record
+# per captured frame, where the score is the frame's mean change from the previous one (0-1)
+ACTIVITY_FILENAME = 'activity.bin'
+ACTIVITY_RECORD = struct.Struct('<Ie')
+ACTIVITY_BUCKET_SECONDS = 60
+activity_cache = {}
+activity_cache_lock = threading.Lock()
+
+def get_day_activity(day):
+    """
+    Aggregates the activity files of every session that can overlap a local day into minute buckets.
+    Returns a list of {minute, mean, max, frames} for minutes with captured frames. Results are
+    cached per day and reused until one of the day's activity files changes.
+    """
+    prefixes = tuple((day - timedelta(days=days)).strftime("%Y%m%d_") for days in (0, 1))
+    files = []
+    for name in list_session_folders(prefixes):
+        activity_path = os.path.join(RECORDINGS_BASE_DIR, name, ACTIVITY_FILENAME)
+        try:
+            stat_result = os.stat(activity_path)
+        except OSError:
+            continue
+        files.append((activity_path, stat_result.st_mtime_ns, stat_result.st_size))
+    signature = tuple(files)
+
+    cache_key = day.strftime("%Y-%m-%d")
+    with activity_cache_lock:
+        cached = activity_cache.get(cache_key)
+    if cached and cached[0] == signature:
+        count_metric('viewer_cache_requests_total', 'cache="activity",result="hit"')
+        return cached[1]
+    count_metric('viewer_cache_requests_total', 'cache="activity",result="miss"')
+
+    day_start = day.timestamp()
+    day_end = (day + timedelta(days=1)).timestamp()
+    buckets = defaultdict(lambda: [0.0, 0.0, 0])
+    for activity_path, _, size in files:
+        with open(activity_path, 'rb') as f:
+            # A record may be half-written while the session is still recording
+            data = f.read(size - size % ACTIVITY_RECORD.size)
+        for timestamp, score in ACTIVITY_RECORD.iter_unpack(data):
+            if day_start <= timestamp < day_end:
+                bucket = buckets[int(timestamp - day_start) // ACTIVITY_BUCKET_SECONDS]
+                bucket[0] += score
+                bucket[1] = max(bucket[1], score)
+                bucket[2] += 1
+    minutes = [{'minute': minute, 'mean': round(total / frames, 4), 'max': round(peak, 4), 'frames': frames}
+               for minute, (total, peak, frames) in sorted(buckets.items())]
+    with activity_cache_lock:
+        activity_cache[cache_key] = (signature, minutes)
+    return minutes
+
+@app.route('/api/activity/<date_str>')
+def api_activity(date_str):
+    """Per-minute activity for a day (YYYY-MM-DD), aggregated from the recorder's per-frame change scores."""
+    try:
+        day = datetime.strptime(date_str, "%Y-%m-%d")
+    except ValueError:
+        abort(400, description="Invalid date format. Please use YYYY-MM-DD.")
+    return jsonify({
+        'date': date_str,
+        'start_timestamp': day.timestamp(),
+        'bucket_seconds': ACTIVITY_BUCKET_SECONDS,
+        'minutes': get_day_activity(day),
+    })
+
+# Whole-day exports are cached here, named by day and a hash of the sessions' (mtime, size),
+# and the least recently used are deleted once the folder is over EXPORT_CACHE_MAX_BYTES.
+# The recorder's disk budget skips this folder and deletes a day's exports when it evicts the day
+EXPORT_CACHE_DIR = os.path.join(RECORDINGS_BASE_DIR, '.exports')
+EXPORT_CACHE_MAX_BYTES = 4 * 1024 ** 3
+# Fragmented MP4 can be played and streamed while it is still being written
+EXPORT_MOVFLAGS = 'frag_keyframe+empty_moov+default_base_moof'
+EXPORT_POLL_SECONDS = 0.25
+export_jobs = {}
+export_jobs_lock = threading.Lock()
+
+class ExportJob:
+    """One ffmpeg run building a day's export into a partial file; every request for it streams that file."""
+    def __init__(self, date_str, sessions, output_path):
+        self.date_str = date_str
+        self.sessions = sessions
+        self.output_path = output_path
+        self.partial_path = output_path + '.partial'
+        self.done = threading.Event()
+        self.error = None
+
+    def start(self):
+        os.makedirs(EXPORT_CACHE_DIR, exist_ok=True)
+        # Created up front so requests can open it before ffmpeg writes anything
+        open(self.partial_path, 'wb').close()
+        threading.Thread(target=self.run, name=f'export-{self.date_str}', daemon=True).start()
+
+    def run(self):
+        try:
+            if export_can_copy(self.sessions):
+                try:
+                    self.concat_copy()
+                except subprocess.CalledProcessError as e:
+                    # Only retry from scratch if nobody has been sent any bytes yet
+                    if os.path.getsize(self.partial_path):
+                        raise
+                    print(f"Stream copy export of {self.date_str} failed, re-encoding: {e.stderr}")
+                    self.reencode()
+            else:
+                self.reencode()
+            # Under the lock, so a request that found this job has opened the partial file first
+            with export_jobs_lock:
+                os.replace(self.partial_path, self.output_path)
+                export_jobs.pop(self.output_path, None)
+            evict_exports(keep=self.output_path)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Error exporting {self.date_str}: {getattr(e, 'stderr', None) or e}")
+            self.error = e
+            with export_jobs_lock:
+                export_jobs.pop(self.output_path, None)
+                try:
+                    os.remove(self.partial_path)
+                except OSError:
+                    pass
+        finally:
+            self.done.set()
+
+    def concat_copy(self):
+        list_path = self.output_path + '.ffconcat'
+        with open(list_path, 'w') as f:
+            f.write("ffconcat version 1.0\n")
+            for recording in self.sessions:
+                f.write(f"file '{os.path.abspath(recording['path'])}'\n")
+        try:
+            self.run_ffmpeg(['-f', 'concat', '-safe', '0', '-i', list_path, '-c', 'copy'])
+        finally:
+            os.remove(list_path)
+
+    def reencode(self):
+        """Scales every session into the largest one's frame, padding as needed, and encodes them as one video."""
+        width = max(recording['width'] or 0 for recording in self.sessions) // 2 * 2 or 1280
+        height = max(recording['height'] or 0 for recording in self.sessions) // 2 * 2 or 720
+        inputs, filters = [], []
+        for number, recording in enumerate(self.sessions):
+            inputs += ['-i', recording['path']]
+            filters.append(f"[{number}:v]scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                           f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1[v{number}]")
+        streams = ''.join(f"[v{number}]" for number in range(len(self.sessions)))
+        filters.append(f"{streams}concat=n={len(self.sessions)}:v=1:a=0[out]")
+        self.run_ffmpeg(inputs + ['-filter_complex', ';'.join(filters), '-map', '[out]',
+                                  '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '28', '-pix_fmt', 'yuv420p'])
+
+    def run_ffmpeg(self, args):
+        cmd = ['ffmpeg', '-y', '-v', 'error'] + args + ['-movflags', EXPORT_MOVFLAGS, '-f', 'mp4', self.partial_path]
+        subprocess.run(cmd, capture_output=True, text=True, check=True, stdin=subprocess.DEVNULL)
+
+def export_can_copy(sessions):
+    """Stream copy only works if every session was encoded with the same size, timing and settings."""
+    signatures = set()
+    for recording in sessions:
+        manifest = read_session_manifest(os.path.dirname(recording['path'])) or {}
+        compaction = manifest.get('compaction')
+        if compaction:
+            # Compaction re-encodes every session the same way, at a constant frame rate
+            signature = ('compacted', compaction.get('profile'), compaction.get('fps'), False)
+        else:
+            signature = (manifest.get('output_mode'), manifest.get('encoder_profile'), manifest.get('fps'),
+                         bool(manifest.get('variable_frame_rate')))
+        signatures.add((recording['width'], recording['height'], *signature))
+    return len(signatures) == 1
+
+def export_path(date_str, sessions):
+    """Cache path for a day's export, changing whenever any of its sessions' videos change."""
+    versions = []
+    for recording in sessions:
+        stat_result = os.stat(recording['path'])
+        versions.append([recording['session_folder'], stat_result.st_mtime_ns, stat_result.st_size])
+    digest = hashlib.sha1(json.dumps(versions).encode()).hexdigest()[:16]
+    return os.path.join(EXPORT_CACHE_DIR, f"{date_str}_{digest}.mp4")
+
+def evict_exports(keep=None):
+    """Deletes the least recently used exports until the cache is under EXPORT_CACHE_MAX_BYTES."""
+    try:
+        entries = [entry for entry in os.scandir(EXPORT_CACHE_DIR) if entry.name.endswith('.mp4')]
+    except OSError:
+        return
+    # Hits touch the file, so mtime is the last use
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    total = sum(entry.stat().st_size for entry in entries)
+    for entry in entries:
+        if total <= EXPORT_CACHE_MAX_BYTES:
+            break
+        if entry.path == keep:
+            continue
+        size = entry.stat().st_size
+        try:
+            os.remove(entry.path)
+            total -= size
+        except OSError:
+            pass
+
+def stream_export(job, f):
+    """Yields the export from its open partial file as ffmpeg writes it, until the job finishes."""
+    with f:
+        while True:
+            chunk = f.read(RANGE_CHUNK_SIZE)
+            if chunk:
+                yield chunk
+            elif job.done.is_set():
+                # The partial file may have been renamed into place; the open handle still reads it.
+                # A failed job just ends the response early.
+                rest = f.read()
+                if rest:
+                    yield rest
+                return
+            else:
+                job.done.wait(EXPORT_POLL_SECONDS)
+
+@app.route('/export/<date_str>.mp4')
+def export_day(date_str):
+    """
+    One continuous video of a day's finished recordings, joined by stream copy (or re-encoded if
+    their encodings differ). The first request streams the file while it is being built; later
+    ones are served from the cache with range support.
+    """
+    try:
+        datetime.strptime(date_str, "%Y-%m-%d")
+    except ValueError:
+        abort(400, description="Invalid date format. Please use YYYY-MM-DD.")
+    days_data, _, _ = get_recordings_info(days=[date_str])
+    recordings = next((day['recordings'] for day in days_data if day['date'] == date_str), [])
+    sessions = [recording for recording in recordings
+                if not recording['live'] and not recording['evicted'] and os.path.isfile(recording['path'])]
+    if not sessions:
+        abort(404, description="No finished recordings for that day.")
+    output_path = export_path(date_str, sessions)
+    download_name = f"recordings_{date_str}.mp4"
+
+    with export_jobs_lock:
+        job = export_jobs.get(output_path)
+        if job is None and not os.path.isfile(output_path):
+            job = ExportJob(date_str, sessions, output_path)
+            export_jobs[output_path] = job
+            job.start()
+            result = 'miss'
+        else:
+            result = 'shared' if job else 'hit'
+        partial_file = open(job.partial_path, 'rb') if job else None
+    count_metric('viewer_cache_requests_total', f'cache="export",result="{result}"')
+
+    if job is None:
+        try:
+            os.utime(output_path)
+        except OSError:
+            pass
+        response = send_file(output_path, mimetype='video/mp4', conditional=True, download_name=download_name,
+                             as_attachment=bool(request.args.get('download')))
+        response.cache_control.no_cache = True
+        return response
+
+    response = Response(stream_with_context(stream_export(job, partial_file)), mimetype='video/mp4')
+    disposition = 'attachment' if request.args.get('download') else 'inline'
+    response.headers['Content-Disposition'] = f'{disposition}; filename="{download_name}"'
+    response.cache_control.no_store = True
+    return response
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    """Times each request up to the response being ready (streamed bodies aren't included)."""
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        with metrics_lock:
+            histogram = request_latency.setdefault(route, Histogram(REQUEST_LATENCY_BUCKETS))
+        histogram.observe(time.perf_counter() - started)
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition of request latency, index scans, ffprobe calls and cache hit rates."""
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+
+    with metrics_lock:
+        routes = sorted(request_latency.items())
+        counters = dict(metric_counters)
+    samples = []
+    for route, histogram in routes:
+        samples.extend(histogram.render('viewer_request_duration_seconds', f'route="{route}"'))
+    metric('viewer_request_duration_seconds', 'histogram', 'Time to produce a response, by route', samples)
+    metric('viewer_index_scan_seconds', 'histogram', 'Time to scan the recordings directory',
+           index_scan_seconds.render('viewer_index_scan_seconds'))
+    metric('viewer_ffprobe_calls_total', 'counter', 'ffprobe processes started to read video metadata',
+           [f"viewer_ffprobe_calls_total {counters.get(('viewer_ffprobe_calls_total', ''), 0)}"])
+    metric('viewer_cache_requests_total', 'counter', 'Metadata index, frame and activity cache lookups by result',
+           [f"viewer_cache_requests_total{{{labels}}} {value}"
+            for (name, labels), value in sorted(counters.items()) if name == 'viewer_cache_requests_total'])
+    with probes_in_flight_lock:
+        probes = len(probes_in_flight)
+    metric('viewer_ffprobe_in_flight', 'gauge', 'Metadata probes queued or running', [f"viewer_ffprobe_in_flight {probes}"])
+    with frame_cache.lock:
+        cached_frames, cached_bytes = len(frame_cache.entries), frame_cache.total_bytes
+    metric('viewer_frame_cache_bytes', 'gauge', 'Bytes of encoded frames held in memory',
+           [f"viewer_frame_cache_bytes {cached_bytes}"])
+    metric('viewer_frame_cache_entries', 'gauge', 'Frames held in memory', [f"viewer_frame_cache_entries {cached_frames}"])
+    return Response("\n".join(lines) + "\n", mimetype='text/plain; version=0.0.4')
+
+def warm_metadata():
+    """Scans every session once in the background, so legacy videos are probed before the first page load."""
+    def warm():
+        started = time.perf_counter()
+        days, _, _ = get_recordings_info()
+        print(f"🔥 Metadata warm: {sum(day['count'] for day in days)} sessions in {time.perf_counter() - started:.1f}s")
+    threading.Thread(target=warm, name='metadata-warmup', daemon=True).start()
+
+def main():
+    global EXPORT_CACHE_MAX_BYTES
+    parser = argparse.ArgumentParser(description="Serve the screen recordings viewer")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=5002, help="Port to listen on (default: 5002)")
+    parser.add_argument("--production", action="store_true",
+                        help="Serve with a multi-threaded WSGI server instead of the debug server")
+    parser.add_argument("--threads", type=int, default=8, help="Request threads in production mode (default: 8)")
+    parser.add_argument("--warm", action="store_true", help="Probe legacy recordings in the background at startup")
+    parser.add_argument("--export-cache-gb", type=float, default=EXPORT_CACHE_MAX_BYTES / 1024 ** 3,
+                        help=f"Disk space for cached day exports (default: {EXPORT_CACHE_MAX_BYTES / 1024 ** 3:g})")
+    args = parser.parse_args()
+    EXPORT_CACHE_MAX_BYTES = int(args.export_cache_gb * 1024 ** 3)
+
     if not os.path.exists(RECORDINGS_BASE_DIR):
         print(f"INFO: Recordings directory '{RECORDINGS_BASE_DIR}' does not exist. It will be scanned if created.")
-        # For local testing, you might want to create it and add dummy files:
-        # os.makedirs(RECORDINGS_BASE_DIR, exist_ok=True)
-        # with open(os.path.join(RECORDINGS_BASE_DIR, f"{datetime.now().strftime('%Y-%m-%d')}_00-00-00_dummy.mp4"), "w") as f: f.write("dummy mp4 content")
-
     print(f"Attempting to serve recordings from: {RECORDINGS_BASE_DIR}")
-    # The rest of your app initialization and routes go here...
+    if args.warm:
+        warm_metadata()
+
+    if not args.production:
+        # Note: debug=True is for development, not for production
+        app.run(debug=True, host=args.host, port=args.port)
+        return
+    try:
+        from waitress import serve
+    except ImportError:
+        # Werkzeug's threaded server without the reloader or debugger; install waitress for a hardened server
+        print("⚠️  waitress is not installed (pip install waitress); using Werkzeug's threaded server")
+        from werkzeug.serving import run_simple
+        run_simple(args.host, args.port, app, threaded=True, use_reloader=False, use_debugger=False)
+        return
+    print(f"🚀 Serving on http://{args.host}:{args.port} with {args.threads} threads")
+    serve(app, host=args.host, port=args.port, threads=args.threads)
 
 if __name__ == '__main__':
-    # Note: debug=True is for development, not for production
-    app.run(debug=True, port=5002)
+    main()
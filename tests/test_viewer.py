@@ -0,0 +1,127 @@
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from concurrent.futures import Future
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'screen_recordings_viewer'))
+import app as viewer  # noqa: E402
+
+
+@pytest.fixture
+def recordings(tmp_path, monkeypatch):
+    monkeypatch.setattr(viewer, 'RECORDINGS_BASE_DIR', str(tmp_path))
+    monkeypatch.setattr(viewer, 'METADATA_INDEX_PATH', str(tmp_path / '.metadata_index.json'))
+    monkeypatch.setattr(viewer, 'metadata_index', None)
+    return tmp_path
+
+
+class ImmediateExecutor:
+    """Runs each job inside submit(), like a probe that finishes before its caller continues."""
+    def submit(self, func, *args):
+        future = Future()
+        future.set_result(func(*args))
+        return future
+
+
+@pytest.mark.parametrize('pool', ['threads', 'immediate'])
+def test_legacy_session_without_ffprobe_does_not_hang(recordings, monkeypatch, pool):
+    # A session folder with a video but no session.json has to be probed
+    session = recordings / '20260101_120000'
+    session.mkdir()
+    (session / 'recording.mp4').write_bytes(b'\0' * 1024)
+    empty_bin = recordings / 'bin'
+    empty_bin.mkdir()
+    monkeypatch.setenv('PATH', str(empty_bin))
+    if pool == 'immediate':
+        monkeypatch.setattr(viewer, 'probe_pool', ImmediateExecutor())
+
+    results = []
+    for _ in range(2):  # the second scan finds the failed probe already finished
+        scan = threading.Thread(target=lambda: results.append(viewer.get_recordings_info()), daemon=True)
+        scan.start()
+        scan.join(timeout=10)
+        assert not scan.is_alive(), "scan deadlocked waiting for the probe"
+
+    days, _, _ = results[-1]
+    assert [recording['session_folder'] for day in days for recording in day['recordings']] == ['20260101_120000']
+    assert not viewer.probes_in_flight
+
+
+def test_concurrent_index_saves_leave_a_complete_index(recordings):
+    sessions = {f'20260101_{i:06d}': {'mtime': i, 'size': i, 'duration': 1.0} for i in range(20000)}
+    saves = [threading.Thread(target=viewer.save_metadata_index, args=(sessions,)) for _ in range(8)]
+    for save in saves:
+        save.start()
+    for save in saves:
+        save.join()
+    assert viewer.load_metadata_index() == sessions
+    assert os.listdir(recordings) == ['.metadata_index.json']
+
+
+@pytest.mark.parametrize('status, age, live', [
+    ('recording', 0, True),
+    ('encoding', 0, True),
+    ('failed', 0, False),
+    ('recording', 3600, False),
+])
+def test_only_fresh_recording_hls_sessions_are_live(recordings, status, age, live):
+    session = recordings / '20250102_100000'
+    (session / 'live').mkdir(parents=True)
+    playlist = session / 'live' / 'playlist.m3u8'
+    playlist.write_text('#EXTM3U\n')
+    manifest = session / 'session.json'
+    manifest.write_text(json.dumps({'status': status, 'output_mode': 'hls', 'start_timestamp': 1735808400}))
+    updated_at = time.time() - age
+    for path in (playlist, manifest):
+        os.utime(path, (updated_at, updated_at))
+    assert bool(viewer.live_playlist_path(str(session), json.loads(manifest.read_text()))) == live
+
+
+@pytest.mark.parametrize('image_format, decodes', [('jpeg', [11]), ('webp', [1])])
+def test_frame_lookup_decodes_once(recordings, monkeypatch, image_format, decodes):
+    start = 1767261600  # 2026-01-01 10:00 UTC
+    session = recordings / '20260101_100000'
+    session.mkdir()
+    (session / 'recording.mp4').write_bytes(b'\0' * 1024)
+    (session / 'session.json').write_text(json.dumps({
+        'status': 'complete', 'start_timestamp': start, 'duration': 60, 'fps': 1, 'variable_frame_rate': False}))
+    (session / 'timestamps.txt').write_text(''.join(f'{n} {start + n}\n' for n in range(60)))
+    calls = []
+
+    def extract_frames(video_filepath, seek, duration, image_format, max_frames):
+        calls.append(max_frames)
+        return b'\xff\xd8frame\xff\xd9' * max_frames
+
+    monkeypatch.setattr(viewer, 'extract_frames', extract_frames)
+    monkeypatch.setattr(viewer, 'frame_cache', viewer.FrameCache(viewer.FRAME_CACHE_MAX_BYTES))
+    result = viewer.get_frame_at(datetime.fromtimestamp(start + 30), image_format)
+    assert result is not None
+    assert calls == decodes
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('bytes=0-9,5-29', [(0, 30)]),
+    ('bytes=20-29,0-9', [(0, 10), (20, 30)]),
+    ('bytes=0-9,-10', [(0, 10), (90, 100)]),
+    ('bytes=0-9,200-', [(0, 10)]),
+    ('bytes=200-300,400-', []),
+    ('bytes=9-0,20-29', None),
+    ('items=0-9,20-29', None),
+])
+def test_parse_byte_ranges(header, expected):
+    assert viewer.parse_byte_ranges(header, 100) == expected
+
+
+def test_overlapping_ranges_are_merged(recordings):
+    session = recordings / '20260101_120000'
+    session.mkdir()
+    (session / 'recording.mp4').write_bytes(bytes(range(100)))
+    response = viewer.app.test_client().get('/recordings/20260101_120000/recording.mp4',
+                                            headers={'Range': 'bytes=0-9,5-29'})
+    assert response.status_code == 206
+    assert response.data == bytes(range(30))